@@ -1,40 +1,73 @@
 import asyncio, time
+import numpy as np
 import pandas as pd
 from ..core.bus import EventBus
-from ..core.types import Event, TOPIC_BAR
+from ..core.types import BarEvent
+from ..core.bars import BAR_COLUMNS
+from ..core.backtest import vectorized_backtest
+from ..core.tracing import Trace
+from ..core.utils import maybe_await
 
 class BacktestAgent:
     def __init__(self, bus: EventBus, exchange, symbols, timeframe: str,
-                 lookback_bars: int = 1000, speed: float = 50.0):
+                 lookback_bars: int = 1000, speed: float = 50.0, cache=None, offline: bool = False):
         self.bus = bus
         self.exchange = exchange
         self.symbols = symbols
         self.timeframe = timeframe
         self.lookback = lookback_bars
         self.speed = max(1.0, speed)
+        self.cache = cache      # optional BarCache
+        self.offline = offline  # serve bars from the cache only, no network
+
+    async def _load(self, sym: str) -> pd.DataFrame:
+        if self.cache is not None:
+            if not self.offline:
+                await self.cache.sync_async(self.exchange, sym, self.timeframe, limit=self.lookback)
+            cols = self.cache.columns(self.exchange.name, sym, self.timeframe, limit=self.lookback)
+            return pd.DataFrame({c: np.asarray(cols[c]) for c in BAR_COLUMNS})
+        ohlcv = await maybe_await(self.exchange.fetch_ohlcv(sym, self.timeframe, limit=self.lookback))
+        return pd.DataFrame(ohlcv, columns=list(BAR_COLUMNS)).astype({"ts":"int64"})
+
+    async def run_batch(self, fast: int = 20, slow: int = 50, cash: float = 0.0,
+                        risk_per_trade_pct: float = 0.01, slippage_bps: float = 5.0, strategy=None,
+                        risk=None):
+        # same strategy/sizing/fills as the event pipeline, computed per symbol without the bus;
+        # `strategy` (strategies.base.Strategy) defaults to sma_cross with fast/slow
+        # `risk` (cfg["risk"]) applies RiskAgent's position/gross caps and drawdown kill switch
+        results = {}
+        for sym in self.symbols:
+            df = await self._load(sym)
+            results[sym] = vectorized_backtest(sym, df["ts"].to_numpy(), df["close"].to_numpy(np.float64),
+                                               fast=fast, slow=slow, cash=cash,
+                                               risk_per_trade_pct=risk_per_trade_pct,
+                                               slippage_bps=slippage_bps, strategy=strategy, risk=risk,
+                                               bars={c: df[c].to_numpy() for c in BAR_COLUMNS})
+        return results
 
     async def run(self):
         # Preload OHLCV for each symbol
-        datasets = {}
-        for sym in self.symbols:
-            ohlcv = self.exchange.fetch_ohlcv(sym, self.timeframe, limit=self.lookback)
-            df = pd.DataFrame(ohlcv, columns=["ts","open","high","low","close","volume"]).astype({"ts":"int64"})
-            datasets[sym] = df
+        frames = await asyncio.gather(*(self._load(sym) for sym in self.symbols))
+        datasets = {sym: {c: df[c].to_numpy() for c in BAR_COLUMNS} for sym, df in zip(self.symbols, frames)}
 
-        # Start replay (growing window)
-        cursors = {s: max(50, min(200, len(datasets[s]))) for s in self.symbols}  # warmup
+        # Start replay: the warmup window goes out as one delta, then one bar per step
+        warmup = {s: max(50, min(200, len(datasets[s]["ts"]))) + 1 for s in self.symbols}
+        cursors = {s: 0 if len(datasets[s]["ts"]) >= warmup[s] else len(datasets[s]["ts"])
+                   for s in self.symbols}
         done = False
         while not done:
             done = True
             t0 = time.time()
-            for sym, df in datasets.items():
+            for sym, cols in datasets.items():
                 i = cursors[sym]
-                if i < len(df):
+                n = len(cols["ts"])
+                if i < n:
                     done = False
-                    sub = df.iloc[: i + 1]
-                    payload = {"symbol": sym, "bars": sub.to_dict(orient="list")}
-                    await self.bus.publish(Event(topic=TOPIC_BAR, payload=payload))
-                    cursors[sym] += 1
+                    j = warmup[sym] if i == 0 else i + 1
+                    # column slices are views into the preloaded arrays
+                    await self.bus.publish(BarEvent(sym, {c: cols[c][i:j] for c in BAR_COLUMNS},
+                                                    trace=Trace.start("bar")))
+                    cursors[sym] = j
 
             # pace
-            await asyncio.sleep(1.0 / self.speed)
\ No newline at end of file
+            await asyncio.sleep(1.0 / self.speed)
@@ -1,29 +1,90 @@
 import asyncio, time
-import pandas as pd
 from typing import Dict, List
 from ..core.bus import EventBus
-from ..core.types import Event, TOPIC_BAR
-from ..core.utils import sleep_jittered
+from ..core.types import Event, BarEvent
+from ..core.bars import bar_delta, bars_to_columns
+from ..core.stream import BarAggregator
+from ..core.tracing import Trace
+from ..core.utils import maybe_await, sleep_jittered
 
 class DataAgent:
-    def __init__(self, bus: EventBus, exchange, symbols: List[str], timeframe: str, interval_sec: int):
+    def __init__(self, bus: EventBus, exchange, symbols: List[str], timeframe: str, interval_sec: int,
+                 cache=None, stream=None, publish_on: str = "update"):
         self.bus = bus
         self.exchange = exchange
+        self.exchange_name = getattr(exchange, "name", None)  # stamped on bars for routing downstream
         self.symbols = symbols
         self.timeframe = timeframe
         self.interval_sec = interval_sec
+        self.cache = cache  # optional BarCache: only bars since the last cached one hit the network
+        self.stream = stream          # optional CcxtProFeed/ReplayFeed replaces REST polling
+        self.publish_on = publish_on  # "update": every change of the forming bar, "close": closed bars only
+        self._last_row: Dict[str, list] = {}  # symbol -> last published bar
+        self._aggs: Dict[str, BarAggregator] = {}
+        self._forming: Dict[str, list] = {}  # symbol -> newest kline seen, for publish_on="close"
 
-    async def run(self):
-        while True:
-            t0 = time.time()
+    async def _fetch(self, sym: str):
+        if self.cache is not None:
+            return await self.cache.fetch_ohlcv_async(self.exchange, sym, self.timeframe, limit=200)
+        return await maybe_await(self.exchange.fetch_ohlcv(sym, self.timeframe, limit=200))
+
+    async def _publish(self, sym: str, rows):
+        delta = bar_delta(rows, self._last_row.get(sym))
+        if not delta:
+            return
+        self._last_row[sym] = list(delta[-1])
+        await self.bus.publish(BarEvent(sym, bars_to_columns(delta), self.exchange_name,
+                                        trace=Trace.start("bar")))
+
+    async def _on_frame(self, sym: str, kind: str, data: list):
+        if kind == "trades":
+            agg = self._aggs.get(sym)
+            if agg is None:
+                agg = self._aggs[sym] = BarAggregator(self.timeframe)
+            rows = []
+            for ts, price, amount in data:
+                rows.extend(agg.add(ts, price, amount))
+            if self.publish_on != "close" and agg.bar is not None:
+                rows.append(list(agg.bar))
+        elif self.publish_on != "close":
+            rows = data
+        else:
+            # kline frames carry only updated candles (often just the forming one): a candle is
+            # closed once a later ts shows up, in this frame or a later one
+            rows = []
+            cur = self._forming.get(sym)
+            for row in data:
+                if cur is None or row[0] >= cur[0]:
+                    if cur is not None and row[0] > cur[0]:
+                        rows.append(cur)
+                    cur = list(row)
+            if cur is not None:
+                self._forming[sym] = cur
+        if rows:
+            await self._publish(sym, rows)
+
+    async def _run_stream(self):
+        async for sym, kind, data in self.stream.stream(self.symbols, self.timeframe):
             try:
-                for sym in self.symbols:
-                    ohlcv = self.exchange.fetch_ohlcv(sym, self.timeframe, limit=200)
-                    df = pd.DataFrame(ohlcv, columns=["ts","open","high","low","close","volume"])
-                    payload = {"symbol": sym, "bars": df.to_dict(orient="list")}
-                    await self.bus.publish(Event(topic=TOPIC_BAR, payload=payload))
+                await self._on_frame(sym, kind, data)
             except Exception as e:
                 await self.bus.publish(Event(topic="alert",
-                    payload={"severity":"error","msg":f"DataAgent: {e}"}))
+                    payload={"severity":"error","msg":f"DataAgent stream: {e}"}))
+
+    async def run(self):
+        if self.stream is not None:
+            return await self._run_stream()
+        while True:
+            t0 = time.time()
+            # with an AsyncExchangeClient all symbols are in flight at once
+            results = await asyncio.gather(*(self._fetch(s) for s in self.symbols), return_exceptions=True)
+            for sym, ohlcv in zip(self.symbols, results):
+                try:
+                    if isinstance(ohlcv, BaseException):
+                        raise ohlcv
+                    await self._publish(sym, ohlcv)
+                except Exception as e:
+                    await self.bus.publish(Event(topic="alert",
+                        payload={"severity":"error","msg":f"DataAgent: {e}"}))
             dt = max(0.0, self.interval_sec - (time.time() - t0))
-            await sleep_jittered(dt, 0.2)
\ No newline at end of file
+            await sleep_jittered(dt, 0.2)
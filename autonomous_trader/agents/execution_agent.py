@@ -1,41 +1,118 @@
+import asyncio
+from typing import Dict, List
 from ..core.bus import EventBus
-from ..core.types import Event, TOPIC_INTENT, TOPIC_ORDER, TOPIC_FILL
+from ..core.types import Event, FillEvent, IntentEvent, OrderEvent, TOPIC_ALERT, TOPIC_INTENT
+from ..core.orders import OrderManager
+from ..core.orderbook import book_for
+from ..core.ratelimit import TokenBucket
+from ..core.tracing import child
+from ..core.utils import shard_of
+
+class ExecutionWorker:
+    # One exchange's order path: its own rate limiter, `lanes` order queues and an OrderManager
+    # that tracks fills. A symbol always maps to the same lane, so its orders stay in sequence
+    # while other symbols proceed.
+    def __init__(self, agent: "ExecutionAgent", name, exchange, lanes: int = 4,
+                 rate_per_sec: float = 10.0, burst: float = None, maxsize: int = 1000,
+                 user_stream=None):
+        self.agent = agent
+        self.name = name
+        self.exchange = exchange
+        self.limiter = TokenBucket(rate_per_sec, burst)
+        self.orders = OrderManager(agent.bus, exchange, name)
+        self.user_stream = user_stream  # optional ccxt.pro client for watch_orders()
+        self.queues: List[asyncio.Queue] = [asyncio.Queue(maxsize) for _ in range(max(1, lanes))]
+        self.submitted = 0
+
+    async def submit(self, ev: IntentEvent):
+        await self.queues[shard_of(ev.symbol, len(self.queues))].put(ev)
+
+    def depth(self) -> int:
+        return sum(q.qsize() for q in self.queues)
+
+    async def _lane(self, q: asyncio.Queue):
+        while True:
+            ev = await q.get()
+            await self.limiter.acquire()
+            await self.orders.submit(ev)
+            self.submitted += 1
+
+    async def run(self):
+        tasks = [self._lane(q) for q in self.queues] + [self.orders.run()]
+        if self.user_stream is not None:
+            tasks.append(self.orders.watch(self.user_stream))
+        await asyncio.gather(*tasks)
 
 class ExecutionAgent:
-    def __init__(self, bus: EventBus, exchange, mode: str = "paper"):
+    def __init__(self, bus: EventBus, exchange, mode: str = "paper", lanes: int = 4,
+                 rate_per_sec: float = 10.0, burst: float = None, books=None, user_streams=None):
         self.bus = bus
-        self.exchange = exchange
+        self.books = books  # optional OrderBooks (or {exchange: OrderBooks}): paper fills sweep the book
+        # one client, or {exchange name: client}; intents route by their `exchange` field
+        self.exchanges = exchange if isinstance(exchange, dict) else {getattr(exchange, "name", None): exchange}
+        self.exchange = next(iter(self.exchanges.values()))
         self.mode = mode
+        user_streams = user_streams or {}  # {exchange name: ccxt.pro client} for user-data streams
+        self.workers: Dict[str, ExecutionWorker] = {
+            name: ExecutionWorker(self, name, ex, lanes, rate_per_sec, burst,
+                                  user_stream=user_streams.get(name))
+            for name, ex in self.exchanges.items()}
+        self._default = next(iter(self.workers.values()))
 
-    async def run(self):
-        q = await self.bus.subscribe(TOPIC_INTENT)
-        while True:
-            ev: Event = await q.get()
-            sym, side, amount, cid = ev.payload["symbol"], ev.payload["side"], \
-                                     float(ev.payload["amount"]), ev.payload["client_id"]
-            px = float(ev.payload.get("px", 0))
+    async def worker(self, ev: IntentEvent):
+        # unrouted intents (exchange=None) go to the first exchange; an intent for a venue with no
+        # worker is dropped with an error alert rather than sent to another venue
+        if ev.exchange is None:
+            return self._default
+        w = self.workers.get(ev.exchange)
+        if w is None:
+            await self.bus.publish(Event(topic=TOPIC_ALERT, payload={
+                "severity": "error", "msg": f"No execution worker for exchange {ev.exchange!r}: "
+                                            f"dropped {ev.client_id}", "symbol": ev.symbol}))
+        return w
 
-            if amount <= 0:
-                continue
+    async def paper_fill(self, ev: IntentEvent):
+        sym, side, amount, cid = ev.symbol, ev.side, float(ev.amount), ev.client_id
+        px = float(ev.px or 0)
+        # sweep the local book when there is one, else a flat 5 bps slippage on px
+        book = book_for(self.books, ev.exchange, sym)
+        swept = book.sweep(side, amount=amount) if book is not None else None
+        if swept is not None:
+            fill_px = swept[0]
+        else:
+            fill_px = px * 1.0005 if side == "buy" else px * 0.9995
+        order_trace = child(ev.trace, "order")
+        await self.bus.publish(OrderEvent(cid, "filled", paper=True, exchange=ev.exchange, trace=order_trace))
+        await self.bus.publish(FillEvent(cid, sym, side, amount, fill_px, ev.exchange,
+                                         trace=child(order_trace, "fill")))
 
+    async def resume(self, orders):
+        # open orders recovered by ReconcileAgent: live ones are tracked again without resending,
+        # paper intents that never filled are filled now
+        for o in orders:
+            ev = o["intent"]
             if self.mode == "paper":
-                # naive fill at px with 5 bps slippage
-                fill_px = px * 1.0005 if side == "buy" else px * 0.9995
-                await self.bus.publish(Event(topic=TOPIC_ORDER,
-                    payload={"client_id": cid, "status":"filled","paper":True}))
-                await self.bus.publish(Event(topic=TOPIC_FILL,
-                    payload={"client_id": cid, "symbol": sym, "side": side, "amount": amount,
-                            "price": fill_px}))
+                if not o["filled"]:
+                    await self.paper_fill(ev)
             else:
-                try:
-                    order = self.exchange.create_market_order(sym, side, amount, client_id=cid)
-                    await self.bus.publish(Event(topic=TOPIC_ORDER,
-                        payload={"client_id": cid, "status":"submitted","id": order.get("id")}))
-                    # NOTE: for simplicity assume immediate fill; production should poll `fetch_order`
-                    avg = order.get("average") or px
-                    await self.bus.publish(Event(topic=TOPIC_FILL,
-                        payload={"client_id": cid, "symbol": sym, "side": side, "amount":
-                                float(order.get("amount", amount)), "price": float(avg)}))
-                except Exception as e:
-                    await self.bus.publish(Event(topic="alert",
-                        payload={"severity":"error","msg":f"Exec error: {e}"}))
\ No newline at end of file
+                worker = await self.worker(ev)
+                if worker is not None:
+                    worker.orders.adopt(ev, o["id"], o["filled"], o["cost"])
+
+    async def _route(self):
+        q = await self.bus.subscribe(TOPIC_INTENT, name="execution")
+        while True:
+            ev: IntentEvent = await q.get()
+            if float(ev.amount) <= 0:
+                continue
+            worker = await self.worker(ev)
+            if worker is None:
+                continue
+            if self.mode == "paper":
+                # simulated fills do no I/O; filling inline keeps them in step with the bars
+                await self.paper_fill(ev)
+                continue
+            await worker.submit(ev)
+
+    async def run(self):
+        await asyncio.gather(self._route(), *(w.run() for w in self.workers.values()))
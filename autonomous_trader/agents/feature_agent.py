@@ -1,22 +1,38 @@
-import asyncio
-import pandas as pd
+from typing import Dict, Optional, Tuple
 from ..core.bus import EventBus
-from ..core.types import Event, TOPIC_BAR, TOPIC_FEATURES
+from ..core.types import BarEvent, FeaturesEvent, TOPIC_BAR
+from ..core.bars import BarBuffer, iter_rows
+from ..core.indicators import IndicatorSet
+from ..core.tracing import child
+from ..core.utils import shard_filter
 
 class FeatureAgent:
-    def __init__(self, bus: EventBus, fast=20, slow=50):
+    def __init__(self, bus: EventBus, fast=20, slow=50, history: int = 500,
+                 shard: Optional[Tuple[int, int]] = None, **indicator_windows):
         self.bus = bus
+        self.shard = shard  # (index, count): only the symbols hashed to this shard
         self.fast = fast
         self.slow = slow
+        self.history = max(history, slow + 1)
+        self.indicator_windows = indicator_windows  # ema=, std=, atr=, vwap=
+        self.buffers: Dict[tuple, BarBuffer] = {}  # (exchange, symbol) -> bars
+        self.indicators: Dict[tuple, IndicatorSet] = {}
+
+    def _state(self, key: tuple):
+        buf = self.buffers.get(key)
+        if buf is None:
+            buf = self.buffers[key] = BarBuffer(self.history)
+            self.indicators[key] = IndicatorSet(self.fast, self.slow, **self.indicator_windows)
+        return buf, self.indicators[key]
 
     async def run(self):
-        q = await self.bus.subscribe(TOPIC_BAR)
+        q = await self.bus.subscribe(TOPIC_BAR, name="feature", accept=shard_filter(self.shard))
         while True:
-            ev: Event = await q.get()
-            sym = ev.payload["symbol"]
-            df = pd.DataFrame(ev.payload["bars"])  # columns ts,open,high,low,close,volume
-            df["sma_fast"] = df["close"].rolling(self.fast).mean()
-            df["sma_slow"] = df["close"].rolling(self.slow).mean()
-            payload = {"symbol": sym, "features":
-                      df[["ts","close","sma_fast","sma_slow"]].tail(2).to_dict(orient="list")}
-            await self.bus.publish(Event(topic=TOPIC_FEATURES, payload=payload))
\ No newline at end of file
+            ev: BarEvent = await q.get()
+            buf, ind = self._state((ev.exchange, ev.symbol))
+            for row in iter_rows(ev.bars):  # delta bars: ts,open,high,low,close,volume
+                ind.update(row, buf.push(row))
+            if len(buf) < 2:
+                continue
+            await self.bus.publish(FeaturesEvent(ev.symbol, ind.features(), ev.exchange,
+                                                 trace=child(ev.trace, "features")))
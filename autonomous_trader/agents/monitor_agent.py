@@ -1,14 +1,49 @@
-import time
+import os, time
 import asyncio
-from ..core.bus import EventBus
-from ..core.types import Event, TOPIC_HEARTBEAT, TOPIC_ALERT
+from ..core.bus import EventBus, TopicPolicy, DROP
+from ..core.types import Event, TOPIC_HEARTBEAT, TOPIC_FEATURES, TOPIC_SIGNAL, \
+    TOPIC_INTENT, TOPIC_ORDER, TOPIC_FILL
+from ..core.tracing import LatencyTracker
+
+TRACED_TOPICS = (TOPIC_FEATURES, TOPIC_SIGNAL, TOPIC_INTENT, TOPIC_ORDER, TOPIC_FILL)
 
 class MonitorAgent:
-    def __init__(self, bus: EventBus, interval_sec: int = 60):
+    def __init__(self, bus: EventBus, interval_sec: int = 60, metrics_path: str = None):
         self.bus = bus
         self.interval = interval_sec
+        self.metrics_path = metrics_path  # optional Prometheus textfile, rewritten every heartbeat
+        self.latency = LatencyTracker()
 
-    async def run(self):
+    def prometheus(self) -> str:
+        lines = [self.latency.prometheus().rstrip("\n")]
+        for name, key, kind in (("trader_bus_queue_depth", "depth", "gauge"),
+                                ("trader_bus_dropped_total", "dropped", "counter"),
+                                ("trader_bus_coalesced_total", "coalesced", "counter"),
+                                ("trader_bus_blocked_total", "blocked", "counter")):
+            lines.append(f"# TYPE {name} {kind}")
+            for m in self.bus.metrics():
+                lines.append(f'{name}{{topic="{m["topic"]}",subscriber="{m["name"]}"}} {m[key]}')
+        return "\n".join(lines) + "\n"
+
+    def _export(self):
+        tmp = self.metrics_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, self.metrics_path)
+
+    async def _observe(self, topic: str):
+        # observes the newest hop of each traced event; drop policy so monitoring never blocks trading
+        q = await self.bus.subscribe(topic, TopicPolicy(DROP, maxsize=10000), name="monitor")
+        while True:
+            ev = await q.get()
+            self.latency.observe(getattr(ev, "trace", None))
+
+    async def _heartbeat(self):
         while True:
             await self.bus.publish(Event(topic=TOPIC_HEARTBEAT, payload={"ts": time.time()}))
-            await asyncio.sleep(self.interval)
\ No newline at end of file
+            if self.metrics_path:
+                self._export()
+            await asyncio.sleep(self.interval)
+
+    async def run(self):
+        await asyncio.gather(self._heartbeat(), *(self._observe(t) for t in TRACED_TOPICS))
@@ -1,28 +1,83 @@
-import os, logging
-import asyncio
-from ..core.bus import EventBus
+import asyncio, logging
+from typing import Dict, List
+from ..core.bus import EventBus, TopicPolicy, DROP
+from ..core.notify import LoggerSink, make_sink
 from ..core.types import Event, TOPIC_ALERT, TOPIC_ORDER, TOPIC_FILL
 
+class _SinkLane:
+    # one sink's bounded batch queue; the oldest batch is dropped when the sink falls behind
+    def __init__(self, sink, maxsize: int):
+        self.sink = sink
+        self.q: asyncio.Queue = asyncio.Queue(maxsize)
+        self.sent = self.dropped = self.failed = 0
+
+    def offer(self, batch: List[Event]):
+        if self.q.full():
+            self.q.get_nowait()
+            self.dropped += 1
+        self.q.put_nowait(batch)
+
+
 class NotifyAgent:
-    def __init__(self, bus: EventBus):
+    # One DROP-policy queue for all notified topics, so the trading path is never held up.
+    # Events are batched for up to `window` seconds or `max_batch` events (an error alert flushes
+    # at once) and each batch is handed to every sink's own lane.
+    def __init__(self, bus: EventBus, sinks=None, window: float = 1.0, max_batch: int = 100,
+                 topics=(TOPIC_ALERT, TOPIC_ORDER, TOPIC_FILL), maxsize: int = 1000, sink_backlog: int = 50):
         self.bus = bus
         self.log = logging.getLogger("trader")
+        self.sinks = list(sinks) if sinks is not None else [LoggerSink(self.log)]
+        self.window = window
+        self.max_batch = max_batch
+        self.topics = tuple(topics)
+        self.maxsize = maxsize
+        self.lanes = [_SinkLane(s, sink_backlog) for s in self.sinks]
+        self.batches = 0
+        self.sub = None
 
-    async def run(self):
-        qa = await self.bus.subscribe(TOPIC_ALERT)
-        qo = await self.bus.subscribe(TOPIC_ORDER)
-        qf = await self.bus.subscribe(TOPIC_FILL)
+    @classmethod
+    def from_config(cls, bus: EventBus, cfg: Dict) -> "NotifyAgent":
+        # cfg["notify"] = {"window": 1.0, "sinks": [{"type": "webhook", "url": ...}, ...]}
+        n = cfg.get("notify") or {}
+        sinks = [make_sink(s) for s in n["sinks"]] if n.get("sinks") else None
+        return cls(bus, sinks, float(n.get("window", 1.0)), int(n.get("max_batch", 100)))
+
+    def stats(self) -> List[Dict]:
+        return [{"sink": type(x.sink).__name__, "sent": x.sent, "dropped": x.dropped, "failed": x.failed,
+                 "backlog": x.q.qsize()} for x in self.lanes]
 
+    async def _drain(self, lane: _SinkLane):
         while True:
-            done, pending = await asyncio.wait({asyncio.create_task(qa.get()),
-                                               asyncio.create_task(qo.get()),
-                                               asyncio.create_task(qf.get())},
-                                              return_when=asyncio.FIRST_COMPLETED)
-            for t in done:
-                ev: Event = t.result()
-                if ev.topic == TOPIC_ALERT:
-                    self.log.warning(f"[ALERT] {ev.payload}")
-                elif ev.topic == TOPIC_ORDER:
-                    self.log.info(f"[ORDER] {ev.payload}")
-                elif ev.topic == TOPIC_FILL:
-                    self.log.info(f"[FILL] {ev.payload}")
\ No newline at end of file
+            batch = await lane.q.get()
+            try:
+                await lane.sink.send(batch)
+                lane.sent += len(batch)
+            except Exception as e:
+                lane.failed += len(batch)
+                self.log.warning(f"Notify sink {type(lane.sink).__name__} failed: {e}")
+
+    async def _batches(self, sub):
+        while True:
+            batch = [await sub.get()]
+            urgent = batch[0].topic == TOPIC_ALERT and batch[0].payload.get("severity") == "error"
+            # wait out the window only while a batch could still fill; under load batches go back to back
+            if self.window and not urgent and sub.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.window)
+            while len(batch) < self.max_batch and not sub.empty():
+                batch.append(sub.get_nowait())
+            self.batches += 1
+            for lane in self.lanes:
+                lane.offer(batch)
+
+    async def run(self):
+        # never backpressure the trading path: a slow notifier drops its own oldest events
+        self.sub = await self.bus.subscribe_many(self.topics, TopicPolicy(DROP, maxsize=self.maxsize), name="notify")
+        workers = [asyncio.create_task(self._drain(lane)) for lane in self.lanes]
+        try:
+            await self._batches(self.sub)
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            for lane in self.lanes:
+                await lane.sink.close()
@@ -1,39 +1,173 @@
-import time
+import asyncio, time
+from collections import OrderedDict
+from typing import Any, Dict, List
 from ..core.bus import EventBus
-from ..core.types import Event, TOPIC_FILL
+from ..core.types import (BarEvent, FillEvent, IntentEvent, ORDER_DONE, TOPIC_BAR, TOPIC_FILL, TOPIC_INTENT, TOPIC_ORDER)
+from ..core.ledger import Ledger
+from ..core.metrics import RollingMetrics
+from ..core import clock
+from ..core.tracing import child
 
 class ReconcileAgent:
-    def __init__(self, bus: EventBus, store, mode: str):
+    # With a Journal, every intent, order and fill is journaled before it is applied, the ledger and
+    # open orders are snapshotted every `journal_snapshot_every` records, and construction recovers
+    # from the last snapshot plus the journal tail, however long the trade history is.
+    # Outside live mode the ledger is marked to each new bar close: one equity row per bar time
+    # goes into `metrics` (RollingMetrics) at once and to the Store with the next ledger snapshot,
+    # in one transaction; live cash lives on the exchange.
+    # Paper/backtest exchange clients read balances from this agent's Ledger: build one
+    # Ledger.load(store) and pass it to both.
+    def __init__(self, bus: EventBus, store, mode: str, ledger: Ledger = None,
+                 snapshot_interval: float = 5.0, latency=None, journal=None,
+                 journal_snapshot_every: int = 5000, remember: int = 10000):
         self.bus = bus
         self.store = store
         self.mode = mode
-        self.positions = {}  # symbol -> (qty, avg_price)
-
-    def apply_fill(self, client_id: str, symbol: str, side: str, amount: float, price: float):
-        qty, avg = self.positions.get(symbol, (0.0, 0.0))
-        if side == "buy":
-            new_qty = qty + amount
-            new_avg = (qty*avg + amount*price) / new_qty if new_qty > 0 else 0.0
-            self.positions[symbol] = (new_qty, new_avg)
-            # cash update (paper/backtest)
-            if self.mode != "live":
-                cash = float(self.store.get_meta("cash_USDT", "0") or 0)
-                cash -= amount * price
-                self.store.set_meta("cash_USDT", str(cash))
-        else:
-            new_qty = qty - amount
-            self.positions[symbol] = (new_qty, avg)
-            if self.mode != "live":
-                cash = float(self.store.get_meta("cash_USDT", "0") or 0)
-                cash += amount * price
-                self.store.set_meta("cash_USDT", str(cash))
+        self.ledger = ledger if ledger is not None else Ledger.load(store)
+        self.positions = self.ledger.positions  # symbol -> [qty, avg_price]
+        self.snapshot_interval = snapshot_interval
+        self.latency = latency  # optional LatencyTracker (MonitorAgent.latency) for the fill->reconciled hop
+        self.journal = journal
+        self.journal_snapshot_every = journal_snapshot_every
+        self.open_orders: Dict[str, Dict[str, Any]] = {}  # client_id -> intent values, status, filled qty and cost
+        self.fill_counts: "OrderedDict[str, int]" = OrderedDict()  # client_id -> fills seen
+        self.remember = remember
+        self.recovered = 0
+        self._since_snapshot = 0
+        self.metrics = RollingMetrics()
+        self.prices: Dict[str, float] = {}  # last close per symbol
+        self._equity_ts = None
+        self._equity_rows: List[tuple] = []  # (ts, equity) not yet in the Store
+        if journal is not None:
+            self.recover()
 
-        self.store.upsert_position(symbol, *self.positions[symbol])
-        self.store.add_trade(client_id, time.time(), symbol, side, amount, price, 0.0, self.mode)
+    def fill_id(self, client_id: str) -> str:
+        # partial fills of one order become trades <cid>, <cid>:1, ... in both run paths; counts are
+        # kept for the `remember` most recently filled orders and journaled, so replays reuse the ids
+        n = self.fill_counts.pop(client_id, 0)
+        self.fill_counts[client_id] = n + 1
+        while len(self.fill_counts) > self.remember:
+            self.fill_counts.popitem(last=False)
+        return f"{client_id}:{n}" if n else client_id
 
-    async def run(self):
-        q = await self.bus.subscribe(TOPIC_FILL)
+    def apply_fill(self, client_id: str, symbol: str, side: str, amount: float, price: float,
+                   ts: float = None):
+        # cash is only tracked locally in paper/backtest; live cash comes from the exchange
+        self.ledger.apply_fill(symbol, side, amount, price, track_cash=self.mode != "live")
+        # backtests stamp trades with market time, like their equity rows; otherwise the fill's own
+        # time, so a journal replay keeps the original trade time
+        if self.mode == "backtest" and self._equity_ts:
+            ts = self._equity_ts / 1000.0
+        elif ts is None:
+            ts = clock.now()
+        self.store.add_trade(client_id, ts, symbol, side, amount, price, 0.0, self.mode)
+        self.metrics.add_trade(amount * price)
+        if time.time() - self.ledger.last_snapshot >= self.snapshot_interval:
+            self.persist()
+
+    def persist(self):
+        # buffered equity rows and the ledger's changes go to the Store together
+        if self._equity_rows:
+            self.store.add_equity_many(self._equity_rows)
+            self._equity_rows = []
+        self.ledger.snapshot(self.store)
+
+    def _apply(self, ev):
+        topic = ev.topic
+        if topic == TOPIC_INTENT:
+            self.open_orders[ev.client_id] = {"intent": ev.values(), "ts": ev.ts, "status": "intent",
+                                              "id": None, "filled": 0.0, "cost": 0.0}
+        elif topic == TOPIC_ORDER:
+            o = self.open_orders.get(ev.client_id)
+            if o is not None:
+                if ev.status in ORDER_DONE:
+                    del self.open_orders[ev.client_id]
+                else:
+                    o["status"], o["id"] = ev.status, ev.id or o["id"]
+        elif topic == TOPIC_FILL:
+            o = self.open_orders.get(ev.client_id)
+            if o is not None:
+                o["filled"] += float(ev.amount)
+                o["cost"] += float(ev.amount) * float(ev.price)
+            self.apply_fill(self.fill_id(ev.client_id), ev.symbol, ev.side, float(ev.amount), float(ev.price),
+                            ev.ts)
+
+    def _journal_state(self) -> Dict[str, Any]:
+        return {"ledger": self.ledger.state(), "open_orders": self.open_orders,
+                "fill_counts": dict(self.fill_counts)}
+
+    def recover(self):
+        seq, state, tail = self.journal.recover()
+        if state is None:
+            # fresh journal: the ledger as loaded is the base the journal builds on
+            self.journal.snapshot(self._journal_state())
+            return
+        self.ledger.restore(state["ledger"])
+        self.open_orders = state["open_orders"]
+        self.fill_counts = OrderedDict(state.get("fill_counts", {}))
+        for ev in tail:
+            self._apply(ev)
+        self.recovered = len(tail)
+        self.ledger.snapshot(self.store)
+
+    def recovered_orders(self) -> List[Dict[str, Any]]:
+        # open orders as of the crash, for ExecutionAgent.resume()
+        return [{"intent": IntentEvent(*o["intent"], ts=o["ts"]), "status": o["status"], "id": o["id"],
+                 "filled": o["filled"], "cost": o["cost"]} for o in self.open_orders.values()]
+
+    async def _run_journaled(self):
+        q = await self.bus.subscribe_many((TOPIC_INTENT, TOPIC_ORDER, TOPIC_FILL), name="reconcile")
         while True:
-            ev: Event = await q.get()
-            self.apply_fill(ev.payload.get("client_id"), ev.payload["symbol"],
-                          ev.payload["side"], float(ev.payload["amount"]), float(ev.payload["price"]))
\ No newline at end of file
+            ev = await q.get()
+            self.journal.append(ev)
+            self._apply(ev)
+            if ev.topic == TOPIC_FILL and self.latency is not None:
+                self.latency.observe(child(ev.trace, "reconciled"))
+            self._since_snapshot += 1
+            if self._since_snapshot >= self.journal_snapshot_every:
+                self.journal.snapshot(self._journal_state())
+                self._since_snapshot = 0
+
+    def _record_equity(self):
+        eq = self.ledger.equity(self.prices)
+        self._equity_rows.append((self._equity_ts / 1000.0, eq))
+        self.metrics.update(eq, self._equity_ts / 1000.0)
+        if time.time() - self.ledger.last_snapshot >= self.snapshot_interval:
+            self.persist()
+
+    def mark(self, symbol: str, ts: int, close: float):
+        # a bar with a newer ts records equity as of the previous bar time's closes
+        if self._equity_ts is None or ts > self._equity_ts:
+            if self._equity_ts is not None:
+                self._record_equity()
+            self._equity_ts = ts
+        self.prices[symbol] = close
+
+    async def _watch_bars(self):
+        q = await self.bus.subscribe(TOPIC_BAR, name="reconcile")
+        while True:
+            ev: BarEvent = await q.get()
+            for ts, close in zip(ev.bars["ts"].tolist(), ev.bars["close"].tolist()):
+                self.mark(ev.symbol, ts, close)
+
+    async def _run_fills(self):
+        q = await self.bus.subscribe(TOPIC_FILL, name="reconcile")
+        while True:
+            ev: FillEvent = await q.get()
+            self.apply_fill(self.fill_id(ev.client_id), ev.symbol, ev.side, float(ev.amount), float(ev.price),
+                            ev.ts)
+            if self.latency is not None:
+                self.latency.observe(child(ev.trace, "reconciled"))
+
+    async def run(self):
+        try:
+            tasks = [self._run_journaled() if self.journal is not None else self._run_fills()]
+            if self.mode != "live":
+                tasks.append(self._watch_bars())
+            await asyncio.gather(*tasks)
+        finally:
+            if self._equity_ts is not None and self.mode != "live":
+                self._record_equity()
+            self.persist()
+            if self.journal is not None:
+                self.journal.snapshot(self._journal_state())
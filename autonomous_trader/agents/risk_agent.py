@@ -1,69 +1,110 @@
-import time, math
+import asyncio, itertools, math
+from typing import Dict, Optional
 from ..core.bus import EventBus
-from ..core.types import Event, TOPIC_SIGNAL, TOPIC_INTENT, TOPIC_ALERT
+from ..core.types import BarEvent, Event, IntentEvent, SignalEvent, TOPIC_BAR, TOPIC_SIGNAL, TOPIC_ALERT
+from ..core.orderbook import book_for
+from ..core.portfolio import PortfolioRisk, quote_of
+from ..core.risk import micro_cap_gate
+from ..core import clock
+from ..core.tracing import child
+from ..core.utils import maybe_await
 
 class RiskAgent:
-    def __init__(self, bus: EventBus, exchange, cfg):
+    def __init__(self, bus: EventBus, exchange, cfg, books=None):
         self.bus = bus
-        self.exchange = exchange
+        self.books = books  # optional OrderBooks (or {exchange: OrderBooks}) for live spread/impact
+        # one client, or {exchange name: client} when signals come from several exchanges
+        self.exchanges = exchange if isinstance(exchange, dict) else {getattr(exchange, "name", None): exchange}
+        self.exchange = next(iter(self.exchanges.values()))
         self.cfg = cfg
+        self._seq = itertools.count()  # keeps client_ids unique within a millisecond
+        self.portfolios: Dict[tuple, PortfolioRisk] = {}  # (exchange, quote) -> positions, prices, limits
         self.last_equity = 0.0
         self.peak_equity = 0.0
 
-    def micro_cap_gate(self, symbol: str, notional: float, edge_bps: float) -> tuple[bool, str]:
+    def client(self, name=None):
+        # None for a venue with no client: never size or gate it from another venue's account
+        return self.exchange if name is None else self.exchanges.get(name)
+
+    def portfolio(self, exchange: Optional[str], quote: str) -> PortfolioRisk:
+        pf = self.portfolios.get((exchange, quote))
+        if pf is None:
+            pf = self.portfolios[(exchange, quote)] = PortfolioRisk.from_config(self.cfg.get("risk", {}), quote)
+        return pf
+
+    def micro_cap_gate(self, symbol: str, notional: float, edge_bps: float,
+                       exchange=None, side: str = "buy") -> tuple[bool, str]:
         p0 = self.cfg.get("phase0", {})
         if not p0.get("enabled", False):
             return True, "disabled"
 
-        meta = self.exchange.market_meta(symbol)
-        min_notional = (meta.get("min_notional") or 0.0) * float(p0.get("min_notional_buffer", 1.0))
-        taker_bps = float(meta.get("taker", 0.001)) * 1e4
-        spread_bps = 10.0  # placeholder; compute from orderbook if available
-        slippage_bps = float(self.cfg.get("execution", {}).get("slippage_bps", 5)) if self.cfg.get("execution") else 5.0
-        safety_bps = float(p0.get("safety_bps", 3))
+        meta = self.client(exchange).market_meta(symbol)
+        book = book_for(self.books, exchange, symbol)
+        if book is not None:
+            spread_bps = book.spread_bps()
+            slippage_bps = book.impact_bps(side, notional)
+            if slippage_bps is None:
+                return False, "book too thin"
+        else:
+            spread_bps = 10.0  # no book for this symbol: flat assumptions
+            slippage_bps = float(self.cfg.get("execution", {}).get("slippage_bps", 5)) if self.cfg.get("execution") else 5.0
+        return micro_cap_gate(p0, meta, notional, self.last_equity, edge_bps, slippage_bps, spread_bps)
 
-        if notional < min_notional:
-            return False, f"below min_notional {min_notional}"
-        if self.last_equity < float(p0.get("min_live_balance_usd", 25)):
-            return False, "low equity"
-        if notional > float(p0.get("max_trade_usd", 1)):
-            return False, "max_trade_usd"
-        if edge_bps <= (taker_bps + spread_bps + slippage_bps + safety_bps):
-            return False, "edge<costs"
-        return True, "ok"
+    async def _watch_bars(self):
+        # closes keep every symbol valued and the correlation history current between signals
+        q = await self.bus.subscribe(TOPIC_BAR, name="risk")
+        while True:
+            ev: BarEvent = await q.get()
+            pf = self.portfolio(ev.exchange, quote_of(ev.symbol))
+            for ts, close in zip(ev.bars["ts"].tolist(), ev.bars["close"].tolist()):
+                pf.mark(ev.symbol, close, ts / 1000.0)
 
     async def run(self):
-        q = await self.bus.subscribe(TOPIC_SIGNAL)
+        await asyncio.gather(self._watch_bars(), self._signals())
+
+    async def _signals(self):
+        q = await self.bus.subscribe(TOPIC_SIGNAL, name="risk")
         while True:
-            ev: Event = await q.get()
-            sym = ev.payload["symbol"]
-            px = float(ev.payload["px"])
-            side = ev.payload["side"]
-            edge_bps = float(ev.payload.get("strength_bps", 0))
+            ev: SignalEvent = await q.get()
+            sym = ev.symbol
+            px = float(ev.px)
+            side = ev.side
+            edge_bps = float(ev.strength_bps or 0)
+            client = self.client(ev.exchange)
+            if client is None:
+                await self.bus.publish(Event(topic=TOPIC_ALERT, payload={
+                    "severity": "error", "msg": f"No exchange client for {ev.exchange!r}: signal dropped",
+                    "symbol": sym}))
+                continue
 
             # balances
-            bal = self.exchange.fetch_balance()
-            usd = float(bal.get("total", {}).get("USDT", 0))
-            btc = float(bal.get("total", {}).get("BTC", 0))
-            self.last_equity = usd + btc * px
-            self.peak_equity = max(self.peak_equity, self.last_equity)
+            pf = self.portfolio(ev.exchange, quote_of(sym))
+            pf.mark(sym, px)
+            pf.sync(await maybe_await(client.fetch_balance()))
+            self.last_equity = pf.equity()
 
             # sizing
             risk_pct = float(self.cfg["risk"]["risk_per_trade_pct"]) if "risk" in self.cfg else 0.01
-            order_value = self.last_equity * risk_pct
-            amount = max(0.0, order_value / px)
+            amount = max(0.0, self.last_equity * risk_pct / px)
 
-            # caps
-            max_pos = self.last_equity * float(self.cfg["risk"]["max_position_pct"]) if "risk" in self.cfg else self.last_equity
-            # simple pos cap: use amount directly for now
+            # caps: symbol, gross exposure, drawdown kill switch, correlation with the book
+            halted = pf.halted
+            amount, _ = pf.check(sym, side, amount, px)
+            self.peak_equity = pf.peak
+            if pf.halted and not halted:
+                await self.bus.publish(Event(topic=TOPIC_ALERT, payload={
+                    "severity": "error", "msg": f"Drawdown kill switch: reduce-only (equity {self.last_equity:.2f}, "
+                                                f"peak {pf.peak:.2f})", "symbol": sym}))
+            if amount <= 0:
+                continue
 
             notional = amount * px
-            ok, reason = self.micro_cap_gate(sym, notional, edge_bps)
+            ok, reason = self.micro_cap_gate(sym, notional, edge_bps, ev.exchange, side)
             if not ok and self.cfg.get("mode") == "live":
                 await self.bus.publish(Event(topic=TOPIC_ALERT,
                     payload={"severity":"warn","msg":f"Gate block: {reason}","symbol":sym}))
                 continue
 
-            intent = {"symbol": sym, "side": side, "amount": amount, "notional": notional,
-                     "px": px, "client_id": f"{sym.replace('/','-')}-{int(time.time()*1000)}"}
-            await self.bus.publish(Event(topic=TOPIC_INTENT, payload=intent))
\ No newline at end of file
+            cid = f"{sym.replace('/','-')}-{int(clock.now()*1000)}-{next(self._seq)}"
+            await self.bus.publish(IntentEvent(sym, side, amount, notional, px, cid, ev.exchange,
+                                               trace=child(ev.trace, "intent")))
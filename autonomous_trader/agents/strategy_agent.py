@@ -1,30 +1,51 @@
+from typing import Dict, Optional, Tuple
 from ..core.bus import EventBus
-from ..core.types import Event, TOPIC_FEATURES, TOPIC_SIGNAL
+from ..core.bars import BarBuffer
+from ..core.indicators import IndicatorSet
+from ..core.types import FeaturesEvent, SignalEvent, TOPIC_FEATURES
+from ..core.tracing import child
+from ..core.utils import shard_filter
+from ..strategies.base import Strategy
+from ..strategies.registry import create
+
+_NAN = float("nan")
 
 class StrategyAgent:
-    def __init__(self, bus: EventBus):
+    def __init__(self, bus: EventBus, shard: Optional[Tuple[int, int]] = None,
+                 strategy: Optional[Strategy] = None):
         self.bus = bus
+        self.shard = shard  # (index, count), as for FeatureAgent
+        self.strategy = strategy if strategy is not None else create("sma_cross")
+        # live rows carry only what FeatureAgent computes, not the raw bar columns a batch run has
+        missing = [c for c in self.strategy.features if c not in IndicatorSet.FIELDS]
+        if missing:
+            raise ValueError(f"Strategy {type(self.strategy).__name__} needs {missing}, which live features "
+                             f"do not carry (available: {list(IndicatorSet.FIELDS)})")
+        self.columns = ("ts",) + tuple(self.strategy.features)
+        self.rows: Dict[tuple, BarBuffer] = {}  # (exchange, symbol) -> the strategy's feature columns
 
-    async def run(self):
-        q = await self.bus.subscribe(TOPIC_FEATURES)
-        while True:
-            ev: Event = await q.get()
-            sym = ev.payload["symbol"]
-            f = ev.payload["features"]
-            # last two rows
-            if len(f["sma_fast"]) >= 2 and len(f["sma_slow"]) >= 2:
-                fast_prev, fast_now = f["sma_fast"][-2], f["sma_fast"][-1]
-                slow_prev, slow_now = f["sma_slow"][-2], f["sma_slow"][-1]
-                close_now = f["close"][-1]
+    def _buffer(self, key: tuple) -> BarBuffer:
+        buf = self.rows.get(key)
+        if buf is None:
+            buf = self.rows[key] = BarBuffer(self.strategy.lookback, self.columns)
+        return buf
 
-                side = None
-                if fast_prev and slow_prev and fast_now and slow_now:
-                    if fast_prev < slow_prev and fast_now > slow_now:
-                        side = "buy"
-                    elif fast_prev > slow_prev and fast_now < slow_now:
-                        side = "sell"
+    def on_features(self, ev: FeaturesEvent) -> Tuple[int, float]:
+        # rows arrive as [previous, newest]; a repeated ts revises the forming bar in place
+        f = ev.features
+        buf = self._buffer((ev.exchange, ev.symbol))
+        for j, ts in enumerate(f["ts"]):
+            if ts is not None:
+                buf.push([ts] + [_NAN if f[c][j] is None else f[c][j] for c in self.strategy.features])
+        if len(buf) < self.strategy.lookback:
+            return 0, 0.0
+        return self.strategy.on_row(buf.columns(self.strategy.lookback))
 
-                if side:
-                    payload = {"symbol": sym, "side": side, "px": close_now,
-                              "strength_bps": abs((fast_now - slow_now)/close_now)*1e4}
-                    await self.bus.publish(Event(topic=TOPIC_SIGNAL, payload=payload))
\ No newline at end of file
+    async def run(self):
+        q = await self.bus.subscribe(TOPIC_FEATURES, name="strategy", accept=shard_filter(self.shard))
+        while True:
+            ev: FeaturesEvent = await q.get()
+            side, strength = self.on_features(ev)
+            if side:
+                await self.bus.publish(SignalEvent(ev.symbol, "buy" if side > 0 else "sell", ev.features["close"][-1],
+                                                   strength, ev.exchange, trace=child(ev.trace, "signal")))
@@ -0,0 +1 @@
+# Benchmarks for autonomous trader
\ No newline at end of file
@@ -0,0 +1,79 @@
+import asyncio, statistics, time, tracemalloc
+import numpy as np
+from ..core.bus import EventBus
+from ..core.bars import BAR_COLUMNS
+from ..core.types import Event, BarEvent, FillEvent, TOPIC_BAR, TOPIC_FILL
+
+# Dict-payload Event vs typed slotted events on the bus hot path.
+#   python -m autonomous_trader.benchmarks.bus_events
+
+N = 20000
+
+
+def _dict_fill(i: int) -> Event:
+    return Event(topic=TOPIC_FILL, payload={"client_id": f"c{i}", "symbol": "BTC/USDT", "side": "buy",
+                                            "amount": 0.01, "price": 50000.0})
+
+
+def _typed_fill(i: int) -> FillEvent:
+    return FillEvent(f"c{i}", "BTC/USDT", "buy", 0.01, 50000.0)
+
+
+def _history(n: int = 1000):
+    cols = {c: np.arange(n, dtype="int64" if c == "ts" else "float64") for c in BAR_COLUMNS}
+    return cols, {c: cols[c].tolist() for c in BAR_COLUMNS}
+
+
+def _alloc_per_event(make) -> float:
+    tracemalloc.start()
+    keep = [make(i) for i in range(N)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keep
+    return size / N
+
+
+async def _latency(make, read) -> float:
+    bus = EventBus()
+    topic = make(0).topic
+    q = await bus.subscribe(topic)
+    lat = []
+
+    async def consume():
+        for _ in range(N):
+            ev = await q.get()
+            read(ev)
+            lat.append(time.perf_counter() - ev.ts)
+
+    task = asyncio.create_task(consume())
+    for i in range(N):
+        ev = make(i)
+        ev.ts = time.perf_counter()
+        await bus.publish(ev)
+        await asyncio.sleep(0)
+    await task
+    return statistics.median(lat) * 1e6
+
+
+def main():
+    arrays, lists = _history()
+    cases = {
+        "fill dict Event": (_dict_fill, lambda ev: float(ev.payload["amount"]) * float(ev.payload["price"])),
+        "fill FillEvent": (_typed_fill, lambda ev: ev.amount * ev.price),
+        # old protocol shipped the whole window; BarEvent ships a one-bar view into preloaded arrays
+        "bar dict full window": (lambda i: Event(topic=TOPIC_BAR, payload={
+            "symbol": "BTC/USDT", "bars": {c: list(lists[c]) for c in BAR_COLUMNS}}),
+            lambda ev: ev.payload["bars"]["close"][-1]),
+        "bar BarEvent delta view": (lambda i: BarEvent("BTC/USDT", {
+            c: arrays[c][i % 999:i % 999 + 1] for c in BAR_COLUMNS}),
+            lambda ev: ev.bars["close"][-1]),
+    }
+    print(f"{'case':<26}{'bytes/event':>14}{'p50 publish->consume (us)':>28}")
+    for name, (make, read) in cases.items():
+        alloc = _alloc_per_event(make)
+        lat = asyncio.run(_latency(make, read))
+        print(f"{name:<26}{alloc:>14.0f}{lat:>28.1f}")
+
+
+if __name__ == "__main__":
+    main()
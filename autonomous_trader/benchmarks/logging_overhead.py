@@ -0,0 +1,38 @@
+import logging, os, statistics, tempfile, time
+from ..core.logging import setup_logging, stop_logging
+
+# Caller-side cost of a log call: a synchronous file handler vs queue mode (JSON lines written
+# by the listener thread), with and without bar sampling.
+#   python -m autonomous_trader.benchmarks.logging_overhead
+
+N = 50000
+
+
+def _measure(log: logging.Logger):
+    lat = []
+    for i in range(N):
+        t0 = time.perf_counter()
+        log.info("bar %s close=%s", "BTC/USDT", 50000.0 + i, extra={"topic": "bar", "symbol": "BTC/USDT"})
+        lat.append(time.perf_counter() - t0)
+    lat.sort()
+    return statistics.median(lat) * 1e6, lat[int(N * 0.99)] * 1e6
+
+
+def main():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "trader.log")
+        logging.basicConfig(level=logging.INFO, handlers=[logging.FileHandler(path)],
+                            format="%(asctime)s %(levelname)s %(message)s", force=True)
+        cases = {"sync file handler": _measure(logging.getLogger("trader"))}
+        for name, sample in (("queue json", None), ("queue json bar 1/100", {"bar": 100})):
+            log = setup_logging("INFO", mode="queue", path=os.path.join(d, "trader.jsonl"), sample=sample)
+            cases[name] = _measure(log)
+            stop_logging()
+        logging.getLogger().handlers.clear()
+    print(f"{'case':<24}{'p50 (us)':>10}{'p99 (us)':>10}")
+    for name, (p50, p99) in cases.items():
+        print(f"{name:<24}{p50:>10.2f}{p99:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import asyncio, cProfile, os, pstats, sys, tempfile, time
+import numpy as np
+from ..core.bus import EventBus
+from ..core.store import Store
+from ..core.ledger import Ledger
+from ..core.replay import Recorder, ReplayExchange, compare, read_events, replay
+from ..agents.backtest_agent import BacktestAgent
+from ..agents.feature_agent import FeatureAgent
+from ..agents.strategy_agent import StrategyAgent
+from ..agents.risk_agent import RiskAgent
+from ..agents.execution_agent import ExecutionAgent
+from ..agents.reconcile_agent import ReconcileAgent
+
+# Full pipeline (features -> strategy -> risk -> paper execution -> reconcile) replayed from a
+# bus recording at full speed, checked against the recorded signals, intents and fills.
+#   python -m autonomous_trader.benchmarks.replay_pipeline [recording.bin] [--profile]
+# Without a recording, a paper run over synthetic bars is recorded first.
+
+CASH = 1000.0
+CFG = {"mode": "backtest", "risk": {"risk_per_trade_pct": 0.1, "max_position_pct": 1}}
+N_BARS = 5000
+
+
+class _SyntheticExchange(ReplayExchange):
+    def fetch_ohlcv(self, symbol, timeframe, limit):
+        rng = np.random.default_rng(1)
+        c = 100 + np.cumsum(rng.normal(size=limit))
+        return [[i * 60000, x, x + 1, x - 1, x, 1.0] for i, x in enumerate(c)]
+
+
+def _pipeline(bus: EventBus, make_exchange):
+    # one Ledger shared by the reconciler and the exchange's paper balances
+    store = Store(":memory:")
+    store.set_meta("cash_USDT", str(CASH))
+    ledger = Ledger.load(store)
+    exchange = make_exchange(ledger)
+    return exchange, [FeatureAgent(bus, 5, 20), StrategyAgent(bus), RiskAgent(bus, exchange, CFG),
+                      ExecutionAgent(bus, exchange, "paper"), ReconcileAgent(bus, store, "backtest", ledger)]
+
+
+async def _record(path: str):
+    bus = EventBus()
+    ex, agents = _pipeline(bus, _SyntheticExchange)
+    tasks = [asyncio.create_task(a.run()) for a in agents]
+    rec = Recorder(path).attach(bus)
+    await asyncio.sleep(0.01)
+    await BacktestAgent(bus, ex, ["BTC/USDT"], "1m", N_BARS, speed=1e9).run()
+    await asyncio.sleep(0.2)
+    rec.close()
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _replay(events, profile: cProfile.Profile = None):
+    bus = EventBus()
+    out = []
+    bus.add_tap(out.append)
+    tasks = [asyncio.create_task(a.run()) for a in _pipeline(bus, ReplayExchange)[1]]
+    if profile is not None:
+        profile.enable()
+    t0 = time.perf_counter()
+    n = await replay(events, bus)
+    dt = time.perf_counter() - t0
+    if profile is not None:
+        profile.disable()
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return n, dt, out
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    path = args[0] if args else os.path.join(tempfile.mkdtemp(), "bus.bin")
+    if not args:
+        t0 = time.perf_counter()
+        asyncio.run(_record(path))
+        print(f"recorded {path} in {time.perf_counter() - t0:.2f}s (paced paper run)")
+    recorded = list(read_events(path))
+    prof = cProfile.Profile() if "--profile" in sys.argv else None
+    runs = [asyncio.run(_replay(recorded, prof if i == 1 else None)) for i in range(2)]
+    print(f"{'run':<10}{'inputs':>8}{'outputs':>9}{'sec':>8}{'inputs/s':>10}{'vs recording':>14}")
+    for i, (n, dt, out) in enumerate(runs):
+        diffs = compare(recorded, out)
+        print(f"{'replay %d' % (i + 1):<10}{n:>8}{len(out) - n:>9}{dt:>8.2f}{n / dt:>10.0f}"
+              f"{'match' if not diffs else '%d diffs' % len(diffs):>14}")
+    if compare(runs[0][2], runs[1][2]):
+        print("replays disagree with each other")
+    if prof is not None:
+        pstats.Stats(prof).sort_stats("cumulative").print_stats(20)
+
+
+if __name__ == "__main__":
+    main()
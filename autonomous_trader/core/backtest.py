@@ -0,0 +1,107 @@
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from .metrics import report
+from .portfolio import PortfolioRisk, quote_of
+from .risk import micro_cap_gate
+from ..strategies.registry import create
+
+# Batch backtest of the event pipeline (FeatureAgent SMAs -> StrategyAgent crossover ->
+# RiskAgent sizing -> paper fill) as array operations over the whole history.
+
+
+@dataclass
+class BacktestResult:
+    symbol: str
+    trades: Dict[str, np.ndarray]          # index, ts, side (+1 buy / -1 sell), amount, price
+    equity: np.ndarray                     # mark-to-market equity per bar
+    cash: float = 0.0
+    qty: float = 0.0
+    params: Dict[str, float] = field(default_factory=dict)
+    ts: Optional[np.ndarray] = None        # bar timestamps (ms) the equity curve is sampled at
+
+    @property
+    def n_trades(self) -> int:
+        return len(self.trades["index"])
+
+    @property
+    def pnl(self) -> float:
+        return float(self.equity[-1] - self.equity[0]) if len(self.equity) else 0.0
+
+    def report(self) -> Dict[str, float]:
+        # core.metrics.report over this run, open positions marked at the last close
+        t = self.trades
+        trades = {"ts": t["ts"] / 1000.0, "symbol": np.full(len(t["ts"]), self.symbol, dtype=object),
+                  "side": t["side"], "qty": t["amount"], "price": t["price"]}
+        # equity[-1] = cash + qty * last close
+        last = {self.symbol: float(self.equity[-1] - self.cash) / self.qty} if self.qty else None
+        return report(trades, self.equity, None if self.ts is None else self.ts / 1000.0, last_price=last)
+
+
+def warmup_bars(n: int) -> int:
+    # index of the first bar BacktestAgent evaluates
+    return max(50, min(200, n))
+
+
+def vectorized_backtest(symbol: str, ts: np.ndarray, close: np.ndarray, fast: int = 20, slow: int = 50,
+                        cash: float = 0.0, risk_per_trade_pct: float = 0.01, slippage_bps: float = 5.0,
+                        start: Optional[int] = None, phase0: Optional[Dict[str, Any]] = None,
+                        meta: Optional[Dict[str, Any]] = None, spread_bps: float = 10.0,
+                        strategy=None, bars: Optional[Dict[str, np.ndarray]] = None,
+                        risk: Optional[Dict[str, Any]] = None) -> BacktestResult:
+    # phase0 is only enforced when passed explicitly (RiskAgent enforces it in live mode only).
+    # Signals come from a strategies.base.Strategy, the registered "sma_cross" with fast/slow by
+    # default, as StrategyAgent runs it; `bars` supplies the OHLCV columns its features need
+    # beyond ts and close. `risk` is RiskAgent's cfg["risk"]: its position/gross caps and drawdown
+    # kill switch apply through the same PortfolioRisk.check.
+    close = np.asarray(close, dtype="float64")
+    ts = np.asarray(ts, dtype="int64")
+    n = len(close)
+    start = warmup_bars(n) if start is None else start
+    gated = bool(phase0 and phase0.get("enabled", False))
+    if strategy is None:
+        strategy = create("sma_cross", fast=fast, slow=slow)
+    sig, edge = strategy.batch(dict(bars or {}, ts=ts, close=close))
+    sig = np.asarray(sig, dtype="int8").copy()
+    sig[:start] = 0
+    idx = np.flatnonzero(sig)
+
+    # sizing depends on equity after earlier fills, so only the sparse signal bars are walked
+    amounts = np.zeros(len(idx))
+    prices = np.zeros(len(idx))
+    slip = slippage_bps / 1e4
+    c, q = float(cash), 0.0
+    quote = quote_of(symbol)
+    pf = PortfolioRisk.from_config(risk or {}, quote)
+    base = symbol.split("/")[0]
+    for k, i in enumerate(idx):
+        px = close[i]
+        pf.mark(symbol, px)
+        pf.sync({"total": {quote: c, base: q}})
+        amount = max(0.0, (c + q * px) * risk_per_trade_pct / px)
+        amount, _ = pf.check(symbol, "buy" if sig[i] > 0 else "sell", amount, px)
+        if amount <= 0:
+            continue
+        if gated:
+            ok, _ = micro_cap_gate(phase0, meta or {}, amount * px, c + q * px, edge[i],
+                                   slippage_bps, spread_bps)
+            if not ok:
+                continue
+        side = sig[i]
+        fill = px * (1 + slip) if side > 0 else px * (1 - slip)
+        q += side * amount
+        c -= side * amount * fill
+        amounts[k], prices[k] = amount, fill
+
+    keep = amounts > 0
+    idx, amounts, prices = idx[keep], amounts[keep], prices[keep]
+    sides = sig[idx].astype("float64")
+    dq = np.zeros(n)
+    dc = np.zeros(n)
+    dq[idx] = sides * amounts
+    dc[idx] = -sides * amounts * prices
+    equity = cash + np.cumsum(dc) + np.cumsum(dq) * close
+
+    trades = {"index": idx, "ts": ts[idx], "side": sig[idx], "amount": amounts, "price": prices}
+    params = {"strategy": strategy.name, **strategy.params}
+    return BacktestResult(symbol, trades, equity, c, q, dict(params, risk_per_trade_pct=risk_per_trade_pct), ts)
@@ -0,0 +1,128 @@
+import os
+import numpy as np
+from typing import Dict, List, Optional
+from .bars import BAR_COLUMNS
+from .utils import maybe_await
+
+# Persistent per-(exchange, symbol, timeframe) OHLCV cache. Each column is a raw little-endian
+# file (ts as int64, the rest float64) that is appended in place and read back via np.memmap,
+# so only bars newer than the last cached timestamp are ever fetched again.
+
+_DTYPES = {c: np.dtype("<i8") if c == "ts" else np.dtype("<f8") for c in BAR_COLUMNS}
+
+
+class BarCache:
+    def __init__(self, root: str, page_limit: int = 1000):
+        self.root = root
+        self.page_limit = page_limit
+
+    def _dir(self, exchange: str, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, exchange, symbol.replace("/", "-"), timeframe)
+
+    def _path(self, d: str, col: str) -> str:
+        return os.path.join(d, f"{col}.bin")
+
+    def count(self, exchange: str, symbol: str, timeframe: str) -> int:
+        p = self._path(self._dir(exchange, symbol, timeframe), "ts")
+        return os.path.getsize(p) // 8 if os.path.exists(p) else 0
+
+    def columns(self, exchange: str, symbol: str, timeframe: str,
+                limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        # read-only memory-mapped views of the newest `limit` bars
+        d = self._dir(exchange, symbol, timeframe)
+        n = self.count(exchange, symbol, timeframe)
+        if not n:
+            return {c: np.empty(0, dtype=_DTYPES[c]) for c in BAR_COLUMNS}
+        start = max(0, n - limit) if limit else 0
+        return {c: np.memmap(self._path(d, c), dtype=_DTYPES[c], mode="r", shape=(n,))[start:]
+                for c in BAR_COLUMNS}
+
+    def last_ts(self, exchange: str, symbol: str, timeframe: str) -> Optional[int]:
+        ts = self.columns(exchange, symbol, timeframe, limit=1)["ts"]
+        return int(ts[-1]) if len(ts) else None
+
+    def write(self, exchange: str, symbol: str, timeframe: str, rows: List[list]) -> int:
+        # merge ohlcv rows; returns the number of bars now cached
+        if not len(rows):
+            return self.count(exchange, symbol, timeframe)
+        d = self._dir(exchange, symbol, timeframe)
+        os.makedirs(d, exist_ok=True)
+        new = np.asarray(rows, dtype="float64")
+        new = new[np.argsort(new[:, 0], kind="stable")]
+        n = self.count(exchange, symbol, timeframe)
+        last = self.last_ts(exchange, symbol, timeframe)
+
+        if last is not None and new[0, 0] < last:
+            # backfill or out-of-order rows: rewrite the merged series (rare)
+            old = self.columns(exchange, symbol, timeframe)
+            merged = np.vstack([np.column_stack([old[c].astype("float64") for c in BAR_COLUMNS]), new])
+            _, keep = np.unique(merged[::-1, 0], return_index=True)  # newest copy of each ts wins
+            merged = merged[::-1][keep]
+            for j, c in enumerate(BAR_COLUMNS):
+                merged[:, j].astype(_DTYPES[c]).tofile(self._path(d, c) + ".tmp")
+                os.replace(self._path(d, c) + ".tmp", self._path(d, c))
+            return len(merged)
+
+        # common path: revise the last cached bar in place, append the rest
+        overlap = int(last is not None and new[0, 0] == last)
+        _, keep = np.unique(new[::-1, 0], return_index=True)
+        new = new[::-1][keep]
+        for j, c in enumerate(BAR_COLUMNS):
+            col = new[:, j].astype(_DTYPES[c])
+            with open(self._path(d, c), "r+b" if n else "wb") as f:
+                f.seek((n - overlap) * 8)
+                f.write(col.tobytes())
+        return n - overlap + len(new)
+
+    def _fetches(self, name: str, symbol: str, timeframe: str, limit: int):
+        # the requests one sync makes, shared by sync() and sync_async(): yields (limit, since) and
+        # is sent the rows fetched. A non-empty cache pages forward from its last bar (which may
+        # still be forming), however stale, so the cached series never has a gap; only then, if it
+        # holds fewer than `limit` bars, the newest `limit` are fetched to backfill older ones.
+        since = self.last_ts(name, symbol, timeframe)
+        while since is not None:
+            rows = yield self.page_limit, since
+            self.write(name, symbol, timeframe, rows)
+            if len(rows) < self.page_limit or rows[-1][0] <= since:
+                break
+            since = rows[-1][0]  # next page starts at the last bar returned
+        if self.count(name, symbol, timeframe) < limit:
+            self.write(name, symbol, timeframe, (yield limit, None))
+
+    def sync(self, client, symbol: str, timeframe: str, limit: int = 200) -> int:
+        # fetch only what is missing since the last cached bar; returns the number of bars cached
+        steps = self._fetches(client.name, symbol, timeframe, limit)
+        try:
+            page, since = next(steps)
+            while True:
+                page, since = steps.send(client.fetch_ohlcv(symbol, timeframe, limit=page, since=since))
+        except StopIteration:
+            return self.count(client.name, symbol, timeframe)
+
+    async def sync_async(self, client, symbol: str, timeframe: str, limit: int = 200) -> int:
+        # same as sync() for ExchangeClient or AsyncExchangeClient, without blocking the loop
+        steps = self._fetches(client.name, symbol, timeframe, limit)
+        try:
+            page, since = next(steps)
+            while True:
+                rows = await maybe_await(client.fetch_ohlcv(symbol, timeframe, limit=page, since=since))
+                page, since = steps.send(rows)
+        except StopIteration:
+            return self.count(client.name, symbol, timeframe)
+
+    def _rows(self, exchange: str, symbol: str, timeframe: str, limit: int) -> List[list]:
+        cols = self.columns(exchange, symbol, timeframe, limit)
+        return [list(r) for r in zip(*(cols[c].tolist() for c in BAR_COLUMNS))]
+
+    def fetch_ohlcv(self, client, symbol: str, timeframe: str, limit: int = 200,
+                    offline: bool = False) -> List[list]:
+        # drop-in for ExchangeClient.fetch_ohlcv backed by the cache
+        if not offline:
+            self.sync(client, symbol, timeframe, limit)
+        return self._rows(client.name, symbol, timeframe, limit)
+
+    async def fetch_ohlcv_async(self, client, symbol: str, timeframe: str, limit: int = 200,
+                                offline: bool = False) -> List[list]:
+        if not offline:
+            await self.sync_async(client, symbol, timeframe, limit)
+        return self._rows(client.name, symbol, timeframe, limit)
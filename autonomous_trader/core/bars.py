@@ -0,0 +1,92 @@
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+BAR_COLUMNS = ("ts", "open", "high", "low", "close", "volume")
+
+
+def bars_to_columns(rows: Sequence[Sequence[float]]) -> Dict[str, np.ndarray]:
+    # row-oriented ohlcv -> contiguous column arrays (ts as int64)
+    arr = np.array(rows, dtype="float64").reshape(-1, len(BAR_COLUMNS)).T.copy()
+    cols = {c: arr[j] for j, c in enumerate(BAR_COLUMNS)}
+    cols["ts"] = cols["ts"].astype("int64")
+    return cols
+
+
+def bar_delta(rows: Sequence[Sequence[float]], last_row: Optional[Sequence[float]]) -> List[Sequence[float]]:
+    # rows newer than last_row, plus the last_row bar itself if it has been revised
+    if not last_row:
+        return list(rows)
+    last_ts = last_row[0]
+    out = []
+    for row in rows:
+        if row[0] > last_ts or (row[0] == last_ts and list(row) != list(last_row)):
+            out.append(row)
+    return out
+
+
+def iter_rows(bars: Dict[str, Sequence[float]]):
+    # rows of a column-oriented delta as plain Python numbers
+    return zip(*(np.asarray(bars[c]).tolist() for c in BAR_COLUMNS))
+
+
+class BarBuffer:
+    # Fixed-capacity ring of OHLCV bars (or any ts-first float columns, e.g. features). Every row
+    # is written twice (slot and slot+capacity), so the most recent n rows are always one
+    # contiguous slice and `tail` never copies.
+    def __init__(self, capacity: int = 1000, columns: Sequence[str] = BAR_COLUMNS):
+        self.capacity = max(2, int(capacity))
+        self.column_names = tuple(columns)
+        self._cols = {c: np.zeros(2 * self.capacity, dtype="int64" if c == "ts" else "float64")
+                      for c in self.column_names}
+        self._head = 0
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        if not self._len:
+            return None
+        return int(self._cols["ts"][self._head - 1 + self.capacity])
+
+    def _write(self, slot: int, row: Sequence[float]):
+        for c, v in zip(self.column_names, row):
+            col = self._cols[c]
+            col[slot] = v
+            col[slot + self.capacity] = v
+
+    def push(self, row: Sequence[float]) -> Optional[str]:
+        # returns "append" for a new bar, "update" for a revision of the last bar, None if stale
+        last = self.last_ts
+        ts = int(row[0])
+        if last is not None and ts < last:
+            return None
+        if last is not None and ts == last:
+            self._write((self._head - 1) % self.capacity, row)
+            return "update"
+        self._write(self._head, row)
+        self._head = (self._head + 1) % self.capacity
+        self._len = min(self._len + 1, self.capacity)
+        return "append"
+
+    def extend(self, bars: Dict[str, Sequence[float]]) -> int:
+        # apply a column-oriented delta; returns the number of appended bars
+        appended = 0
+        for row in iter_rows(bars):
+            if self.push(row) == "append":
+                appended += 1
+        return appended
+
+    def tail(self, column: str, n: Optional[int] = None) -> np.ndarray:
+        n = self._len if n is None else min(n, self._len)
+        end = self._head + self.capacity
+        return self._cols[column][end - n:end]
+
+    def columns(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        return {c: self.tail(c, n) for c in self.column_names}
+
+
+def merge_bar_deltas(older: Dict[str, Sequence], newer: Dict[str, Sequence]) -> Dict[str, np.ndarray]:
+    # two queued deltas for one symbol collapse into one; BarBuffer treats a repeated ts as a revision
+    return {c: np.concatenate((older[c], newer[c])) for c in BAR_COLUMNS}
@@ -1,30 +1,166 @@
-import asyncio
-from typing import Dict, List
-from .types import Event
+import asyncio, time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from .types import (Event, BarEvent, FeaturesEvent, TOPIC_BAR, TOPIC_FEATURES, TOPIC_SIGNAL, TOPIC_INTENT, TOPIC_ORDER,
+                    TOPIC_FILL, TOPIC_ALERT, TOPIC_HEARTBEAT)
+from .bars import merge_bar_deltas
+
+LOSSLESS = "lossless"  # bounded queue; publish waits for room instead of dropping
+COALESCE = "coalesce"  # one pending event per key; newer events merge into it
+DROP = "drop"          # bounded queue; the oldest event is dropped when full
+
+@dataclass
+class TopicPolicy:
+    kind: str = DROP
+    maxsize: int = 1000
+    key: Optional[Callable[[Event], Any]] = None             # coalesce key
+    merge: Optional[Callable[[Event, Event], Event]] = None  # coalesce merge, default keeps the newer
+
+def _symbol_key(ev):
+    sym = getattr(ev, "symbol", None)
+    if sym is None:
+        return ev.payload.get("symbol")
+    return (ev.exchange, sym) if getattr(ev, "exchange", None) else sym
+
+def _merge_bars(old: BarEvent, new: BarEvent) -> BarEvent:
+    return BarEvent(new.symbol, merge_bar_deltas(old.bars, new.bars), new.exchange, ts=new.ts, trace=new.trace)
+
+def _merge_features(old: FeaturesEvent, new: FeaturesEvent) -> FeaturesEvent:
+    # keep the older "previous" row so a crossover between the two events is still visible
+    fo, fn = old.features, new.features
+    features = {k: [fo[k][0], fn[k][-1]] if k in fo else fn[k] for k in fn}
+    return FeaturesEvent(new.symbol, features, new.exchange, ts=new.ts, trace=new.trace)
+
+DEFAULT_POLICIES: Dict[str, TopicPolicy] = {
+    TOPIC_BAR: TopicPolicy(COALESCE, key=_symbol_key, merge=_merge_bars),
+    TOPIC_FEATURES: TopicPolicy(COALESCE, key=_symbol_key, merge=_merge_features),
+    TOPIC_SIGNAL: TopicPolicy(LOSSLESS),
+    TOPIC_INTENT: TopicPolicy(LOSSLESS),
+    TOPIC_ORDER: TopicPolicy(LOSSLESS),
+    TOPIC_FILL: TopicPolicy(LOSSLESS),
+    TOPIC_ALERT: TopicPolicy(DROP),
+    TOPIC_HEARTBEAT: TopicPolicy(DROP, maxsize=10),
+}
+
+class Subscription:
+    # one subscriber's queue plus its delivery counters; get()/get_nowait() mirror asyncio.Queue
+    def __init__(self, topic: str, policy: TopicPolicy, name: str = "",
+                 accept: Optional[Callable[[Event], bool]] = None):
+        self.topic = topic
+        self.policy = policy
+        self.name = name
+        self.accept = accept  # optional filter, e.g. the symbols of one shard
+        self.published = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.blocked = 0
+        self.blocked_sec = 0.0
+        self._q: asyncio.Queue = asyncio.Queue(maxsize=0 if policy.kind == COALESCE else policy.maxsize)
+        self._pending: "OrderedDict[Any, Event]" = OrderedDict()
+
+    def qsize(self) -> int:
+        return self._q.qsize()
+
+    def empty(self) -> bool:
+        return self._q.empty()
+
+    def put_nowait(self, ev: Event) -> bool:
+        # False only when a lossless queue is full and the caller has to wait
+        self.published += 1
+        kind = self.policy.kind
+        if kind == COALESCE:
+            k = self.policy.key(ev) if self.policy.key else None
+            old = self._pending.get(k)
+            if old is not None:
+                self._pending[k] = self.policy.merge(old, ev) if self.policy.merge else ev
+                self.coalesced += 1
+            else:
+                self._pending[k] = ev
+                self._q.put_nowait(k)
+            return True
+        if self._q.full():
+            if kind == LOSSLESS:
+                self.published -= 1
+                return False
+            self._q.get_nowait()
+            self.dropped += 1
+        self._q.put_nowait(ev)
+        return True
+
+    async def put(self, ev: Event):
+        if self.put_nowait(ev):
+            return
+        self.blocked += 1
+        t0 = time.monotonic()
+        await self._q.put(ev)
+        self.published += 1
+        self.blocked_sec += time.monotonic() - t0
+
+    def _unwrap(self, item) -> Event:
+        return self._pending.pop(item) if self.policy.kind == COALESCE else item
+
+    async def get(self) -> Event:
+        return self._unwrap(await self._q.get())
+
+    def get_nowait(self) -> Event:
+        return self._unwrap(self._q.get_nowait())
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"topic": self.topic, "name": self.name, "policy": self.policy.kind,
+                "depth": self.qsize(), "maxsize": self.policy.maxsize, "published": self.published,
+                "dropped": self.dropped, "coalesced": self.coalesced, "blocked": self.blocked,
+                "blocked_sec": self.blocked_sec}
 
 class EventBus:
-    def __init__(self):
-        self._topics: Dict[str, List[asyncio.Queue]] = {}
+    def __init__(self, policies: Optional[Dict[str, TopicPolicy]] = None):
+        self._topics: Dict[str, List[Subscription]] = {}
         self._lock = asyncio.Lock()
+        self.policies = dict(DEFAULT_POLICIES, **(policies or {}))
+        self._taps: List[Callable[[Event], None]] = []
+
+    async def subscribe(self, topic: str, policy: Optional[TopicPolicy] = None,
+                        name: str = "", accept: Optional[Callable[[Event], bool]] = None) -> Subscription:
+        # policy overrides the topic default for this subscriber only (e.g. DROP for a notifier);
+        # events for which accept() is false never reach this subscriber's queue
+        sub = Subscription(topic, policy or self.policies.get(topic, TopicPolicy()), name, accept)
+        await self._attach(topic, sub)
+        return sub
 
-    async def subscribe(self, topic: str) -> asyncio.Queue:
-        q: asyncio.Queue = asyncio.Queue(maxsize=1000)
+    async def subscribe_many(self, topics, policy: Optional[TopicPolicy] = None,
+                             name: str = "", accept: Optional[Callable[[Event], bool]] = None) -> Subscription:
+        # one queue fed by several topics, so a consumer sees them in publish order
+        sub = Subscription("+".join(topics), policy or TopicPolicy(LOSSLESS), name, accept)
+        for topic in topics:
+            await self._attach(topic, sub)
+        return sub
+
+    async def _attach(self, topic: str, sub: Subscription):
         async with self._lock:
-            self._topics.setdefault(topic, []).append(q)
-        return q
+            self._topics.setdefault(topic, []).append(sub)
+
+    def add_tap(self, fn: Callable[[Event], None]):
+        # fn sees every published event, subscribed topic or not (e.g. a Recorder)
+        self._taps.append(fn)
+
+    def remove_tap(self, fn: Callable[[Event], None]):
+        self._taps.remove(fn)
+
+    def idle(self) -> bool:
+        return all(s.empty() for subs in self._topics.values() for s in subs)
 
     async def publish(self, event: Event):
-        qs = self._topics.get(event.topic, [])
-        for q in qs:
-            try:
-                q.put_nowait(event)
-            except asyncio.QueueFull:
-                # drop oldest to keep moving
-                try:
-                    q.get_nowait()
-                except Exception:
-                    pass
-                await q.put(event)
+        for tap in self._taps:
+            tap(event)
+        for sub in self._topics.get(event.topic, ()):
+            if sub.accept is not None and not sub.accept(event):
+                continue
+            if not sub.put_nowait(event):
+                await sub.put(event)
 
     def subscribers(self, topic: str) -> int:
-        return len(self._topics.get(topic, []))
\ No newline at end of file
+        return len(self._topics.get(topic, []))
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        subs = {id(s): s for topic_subs in self._topics.values() for s in topic_subs}
+        return [s.metrics() for s in subs.values()]
@@ -0,0 +1,24 @@
+import time
+
+# Wall clock for event timestamps, client ids and trade times. A replay installs a clock driven by
+# the recorded events, so a run gives the same output whenever and however fast it happens.
+
+_now = time.time
+
+
+def now() -> float:
+    return _now()
+
+
+def set_clock(fn=None):
+    # fn() -> epoch seconds; None restores time.time
+    global _now
+    _now = fn or time.time
+
+
+class ReplayClock:
+    def __init__(self, t: float = 0.0):
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
@@ -0,0 +1,98 @@
+import pickle, struct
+import numpy as np
+from .bars import BAR_COLUMNS
+from .types import (Event, BarEvent, TypedEvent, TYPED_EVENTS, TOPIC_BAR, TOPIC_FEATURES, TOPIC_SIGNAL, TOPIC_INTENT, TOPIC_ORDER,
+                    TOPIC_FILL, TOPIC_ALERT, TOPIC_HEARTBEAT)
+
+# Binary Event encoding: u8 topic id | u8 kind | f64 ts | body. Known topics take one byte; any
+# other topic is sent as id 0 followed by a u8-length name. The body is a pickled payload dict
+# (generic Event), a pickled tuple of field values (typed events) or, for BarEvent, the symbol,
+# exchange and raw column buffers that decode back into NumPy views without copying. Typed
+# events carry their Trace (if any) across the wire. Pickle means this is only for trusted local
+# transports.
+
+TOPICS = (TOPIC_BAR, TOPIC_FEATURES, TOPIC_SIGNAL, TOPIC_INTENT, TOPIC_ORDER, TOPIC_FILL,
+          TOPIC_ALERT, TOPIC_HEARTBEAT)
+_TOPIC_ID = {t: i + 1 for i, t in enumerate(TOPICS)}
+_HEAD = struct.Struct("<BBd")
+_GENERIC, _TYPED, _BARS = 0, 1, 2
+_BAR_DTYPES = [np.dtype("<i8") if c == "ts" else np.dtype("<f8") for c in BAR_COLUMNS]
+_LEN = struct.Struct("<I")
+
+
+def _encode_bars(ev: BarEvent) -> bytes:
+    sym = ev.symbol.encode()
+    exch = (ev.exchange or "").encode()
+    cols = [np.ascontiguousarray(ev.bars[c], dtype=dt) for c, dt in zip(BAR_COLUMNS, _BAR_DTYPES)]
+    parts = [bytes((len(sym),)), sym, bytes((len(exch),)), exch, _LEN.pack(len(cols[0]))]
+    parts += [c.tobytes() for c in cols]
+    if ev.trace is not None:
+        parts.append(pickle.dumps(ev.trace, protocol=5))
+    return b"".join(parts)
+
+
+def _decode_bars(buf, off: int, ts: float) -> BarEvent:
+    n = buf[off]
+    sym = bytes(buf[off + 1:off + 1 + n]).decode()
+    off += 1 + n
+    n = buf[off]
+    exch = bytes(buf[off + 1:off + 1 + n]).decode() or None
+    off += 1 + n
+    rows, = _LEN.unpack_from(buf, off)
+    off += _LEN.size
+    bars = {}
+    for c, dt in zip(BAR_COLUMNS, _BAR_DTYPES):
+        bars[c] = np.frombuffer(buf, dtype=dt, count=rows, offset=off)
+        off += rows * dt.itemsize
+    trace = pickle.loads(memoryview(buf)[off:]) if off < len(buf) else None
+    return BarEvent(sym, bars, exch, ts=ts, trace=trace)
+
+
+def encode(ev) -> bytes:
+    tid = _TOPIC_ID.get(ev.topic, 0)
+    if isinstance(ev, BarEvent):
+        kind, body = _BARS, _encode_bars(ev)
+    elif isinstance(ev, TypedEvent):
+        kind, body = _TYPED, pickle.dumps((ev.values(), ev.trace), protocol=5)
+    else:
+        kind, body = _GENERIC, pickle.dumps(ev.payload, protocol=5)
+    head = _HEAD.pack(tid, kind, ev.ts)
+    if not tid:
+        name = ev.topic.encode()
+        head += bytes((len(name),)) + name
+    return head + body
+
+
+def _topic(buf, tid: int):
+    if tid:
+        return TOPICS[tid - 1], _HEAD.size
+    n = buf[_HEAD.size]
+    start = _HEAD.size + 1
+    return bytes(buf[start:start + n]).decode(), start + n
+
+
+def peek_topic(buf) -> str:
+    # topic of an encoded event without touching the payload
+    return _topic(buf, buf[0])[0]
+
+
+def decode(buf):
+    tid, kind, ts = _HEAD.unpack_from(buf)
+    topic, off = _topic(buf, tid)
+    if kind == _BARS:
+        return _decode_bars(buf, off, ts)
+    if kind == _TYPED:
+        values, trace = pickle.loads(memoryview(buf)[off:])
+        return TYPED_EVENTS[topic](*values, ts=ts, trace=trace)
+    return Event(topic=topic, ts=ts, payload=pickle.loads(memoryview(buf)[off:]))
+
+
+def frame(kind: bytes, body: bytes) -> bytes:
+    # length-prefixed stream frame: u32 length | 1-byte kind | body
+    return _LEN.pack(len(body) + 1) + kind + body
+
+
+async def read_frame(reader):
+    n, = _LEN.unpack(await reader.readexactly(_LEN.size))
+    data = await reader.readexactly(n)
+    return data[:1], data[1:]
@@ -1,45 +1,76 @@
-import os, time
+import os, asyncio, functools, threading
 import ccxt
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
+from .markets import MarketIndex
+from .ratelimit import Coalescer, TokenBucket, TTLCache
+
+def _credentials(name: str) -> Dict[str, Any]:
+    if name == "binance":
+        return {"apiKey": os.getenv("BINANCE_KEY"), "secret": os.getenv("BINANCE_SECRET")}
+    return {}
+
+def _check_ledger(mode: str, ledger):
+    # paper/backtest balances must be the reconciler's live Ledger: the Store only holds its
+    # periodic snapshots, so sizing from SQLite would act on positions seconds old
+    if mode in ("paper", "backtest") and ledger is None:
+        raise ValueError(f"{mode} mode needs the Ledger shared with ReconcileAgent (ledger=...)")
+
+def _refresh_delay(index: MarketIndex, interval: float) -> float:
+    # a persisted table younger than the refresh interval is served as-is until it ages out
+    return max(0.0, interval - index.age())
 
 class ExchangeClient:
-    def __init__(self, name: str, mode: str, store=None):
+    # Markets load on a background thread: market_meta() serves the table persisted at
+    # `markets_path` (if any) until the first refresh lands, so construction never blocks.
+    def __init__(self, name: str, mode: str, store=None, ledger=None, markets_path: str = None,
+                 markets_refresh_sec: float = 3600.0):
+        _check_ledger(mode, ledger)
         self.name = name
         self.mode = mode
         self.store = store
-        cfg = {}
-        if name == "binance":
-            cfg = {"apiKey": os.getenv("BINANCE_KEY"), "secret": os.getenv("BINANCE_SECRET")}
-        self.ex = getattr(ccxt, name)(cfg)
+        self.ledger = ledger  # paper/backtest balances come from here without touching SQLite
+        self.ex = getattr(ccxt, name)(_credentials(name))
         if mode == "paper":
             try:
                 self.ex.set_sandbox_mode(True)
             except Exception:
                 pass
-        self.markets = self.ex.load_markets()
+        self.markets: Dict[str, Any] = {}
+        self.markets_path = markets_path
+        self.markets_refresh_sec = markets_refresh_sec
+        self.index = MarketIndex.load(markets_path) or MarketIndex()
+        self._stop = threading.Event()
+        threading.Thread(target=self._markets_loop, name=f"{name}-markets", daemon=True).start()
+
+    def refresh_markets(self):
+        markets = self.ex.load_markets(True)
+        self.markets = markets
+        self.index.replace(MarketIndex.from_markets(markets))
+        if self.markets_path:
+            self.index.save(self.markets_path)
+
+    def _markets_loop(self):
+        delay = _refresh_delay(self.index, self.markets_refresh_sec)
+        while not self._stop.wait(delay):
+            try:
+                self.refresh_markets()
+                delay = self.markets_refresh_sec
+            except Exception:
+                delay = min(60.0, self.markets_refresh_sec)  # keep serving the old table, retry soon
+
+    def close(self):
+        self._stop.set()
 
     def market_meta(self, symbol: str) -> Dict[str, Any]:
-        m = self.markets.get(symbol, {})
-        limits = m.get("limits", {})
-        cost_min = (limits.get("cost") or {}).get("min")
-        step = (m.get("precision") or {}).get("amount")
-        tick = (m.get("precision") or {}).get("price")
-        taker = m.get("taker", 0.001)
-        maker = m.get("maker", 0.001)
-        return {"min_notional": cost_min or 0.0, "step": step, "tick": tick,
-                "taker": taker, "maker": maker}
-
-    def fetch_ohlcv(self, symbol: str, timeframe: str = "1m", limit: int = 200):
-        return self.ex.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+        return self.index.meta(symbol)
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = "1m", limit: int = 200, since: int = None):
+        return self.ex.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
 
     def fetch_balance(self):
-        if self.mode in ("paper", "backtest") and self.store is not None:
-            cash = float(self.store.get_meta("cash_USDT", "0") or 0)
-            totals = {"USDT": cash}
-            for sym, qty, _ in self.store.get_positions():
-                base = sym.split("/")[0]
-                totals[base] = totals.get(base, 0.0) + float(qty)
-            return {"total": totals}
+        if self.mode in ("paper", "backtest"):
+            return self.ledger.balance()
         return self.ex.fetch_balance()
 
     def fetch_ticker(self, symbol: str):
@@ -48,4 +79,192 @@ class ExchangeClient:
     def create_market_order(self, symbol: str, side: str, amount: float,
                            client_id: str = None):
         params = {"clientOrderId": client_id} if client_id else {}
-        return self.ex.create_order(symbol, "market", side, amount, None, params)
\ No newline at end of file
+        return self.ex.create_order(symbol, "market", side, amount, None, params)
+
+    def fetch_orders(self, symbol: str, since: int = None):
+        return self.ex.fetch_orders(symbol, since)
+
+    def fetch_open_orders(self, symbol: str = None):
+        return self.ex.fetch_open_orders(symbol)
+
+# request weight per endpoint against the client's TokenBucket; override per exchange via `weights`
+ENDPOINT_WEIGHTS = {"fetch_ohlcv": 1, "fetch_ticker": 1, "fetch_balance": 5, "create_order": 1,
+                    "fetch_orders": 10, "fetch_open_orders": 3}
+
+class AsyncExchangeClient:
+    # Non-blocking counterpart of ExchangeClient with the same method names as coroutines.
+    # backend="ccxt" drives ccxt.async_support over one pooled aiohttp session; backend="threads"
+    # runs a sync ExchangeClient on a bounded thread pool. Call `await connect()` before use.
+    # Every request passes one weighted TokenBucket; identical concurrent reads share one
+    # in-flight request, and balances/tickers are cached for `cache_ttl` seconds until invalidate().
+    def __init__(self, name: str, mode: str, store=None, backend: str = "ccxt", max_connections: int = 16,
+                 ledger=None, rate_per_sec: float = None, burst: float = None,
+                 weights: Dict[str, float] = None, cache_ttl: float = 1.0, markets_path: str = None,
+                 markets_refresh_sec: float = 3600.0):
+        if backend not in ("ccxt", "threads"):
+            raise ValueError(f"unknown backend {backend!r}")
+        _check_ledger(mode, ledger)
+        self.name = name
+        self.mode = mode
+        self.store = store
+        self.ledger = ledger
+        self.backend = backend
+        self.max_connections = max_connections
+        self.rate_per_sec = rate_per_sec  # None: derived from ccxt's rateLimit on connect
+        self.burst = burst
+        self.weights = dict(ENDPOINT_WEIGHTS, **(weights or {}))
+        self.limiter = self._bucket(rate_per_sec or 10.0)
+        self.inflight = Coalescer()
+        self.cache = TTLCache(cache_ttl)
+        self.markets: Dict[str, Any] = {}
+        self.markets_path = markets_path
+        self.markets_refresh_sec = markets_refresh_sec
+        self.index = MarketIndex.load(markets_path) or MarketIndex()
+        self._markets_task = None
+        self.ex = None
+        self._sync = None
+        self._pool = None
+        self._session = None
+
+    async def connect(self):
+        if self.backend == "threads":
+            self._pool = ThreadPoolExecutor(max_workers=self.max_connections,
+                                            thread_name_prefix=f"{self.name}-io")
+            self._sync = await self._offload(ExchangeClient, self.name, self.mode, self.store, self.ledger,
+                                             self.markets_path, self.markets_refresh_sec)
+            self.ex, self.index = self._sync.ex, self._sync.index
+            self._set_rate()
+            return self
+
+        import aiohttp
+        import ccxt.async_support as ccxt_async
+        self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(
+            limit=self.max_connections, ttl_dns_cache=300, enable_cleanup_closed=True))
+        # throttling is done by self.limiter, so ccxt's own per-call throttle is switched off
+        self.ex = getattr(ccxt_async, self.name)({**_credentials(self.name), "session": self._session,
+                                                  "enableRateLimit": False})
+        self._set_rate()
+        if self.mode == "paper":
+            try:
+                self.ex.set_sandbox_mode(True)
+            except Exception:
+                pass
+        # not awaited: requests work before markets land, market_meta() serves the persisted table
+        self._markets_task = asyncio.ensure_future(self._markets_loop())
+        return self
+
+    async def refresh_markets(self):
+        markets = await self.ex.load_markets(True)
+        self.markets = markets
+        fresh = MarketIndex.from_markets(markets)
+        if self.markets_path:
+            await self._offload(fresh.save, self.markets_path)
+        self.index.replace(fresh)
+
+    async def _markets_loop(self):
+        delay = _refresh_delay(self.index, self.markets_refresh_sec)
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.refresh_markets()
+                delay = self.markets_refresh_sec
+            except Exception:
+                delay = min(60.0, self.markets_refresh_sec)
+
+    async def close(self):
+        if self._markets_task is not None:
+            self._markets_task.cancel()
+        if self._sync is not None:
+            self._sync.close()
+        if self.backend == "ccxt" and self.ex is not None:
+            await self.ex.close()
+        if self._session is not None:
+            await self._session.close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+
+    async def _offload(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+
+    def _bucket(self, rate: float) -> TokenBucket:
+        # capacity covers the heaviest endpoint, else a slow venue could never afford it
+        heaviest = max(self.weights.values())
+        return TokenBucket(rate, max(self.burst or rate, 1.0, heaviest))
+
+    def _set_rate(self):
+        # ccxt's rateLimit is the minimum spacing between weight-1 requests, in milliseconds
+        spacing = getattr(self.ex, "rateLimit", None)
+        if self.rate_per_sec is None and spacing:
+            self.limiter = self._bucket(1000.0 / spacing)
+
+    async def _request(self, endpoint: str, key, fn, *args, cached: bool = False):
+        if cached:
+            hit = self.cache.get(key)
+            if hit is not None:
+                return hit
+        generation = self.cache.generation
+
+        async def call():
+            await self.limiter.acquire(self.weights.get(endpoint, 1))
+            if self._sync is not None:
+                res = await self._offload(getattr(self._sync, endpoint), *args)
+            else:
+                res = await fn(*args)
+            if cached:
+                self.cache.put(key, res, generation)
+            return res
+        return await self.inflight.run(key, call)
+
+    def invalidate(self, symbol: str = None):
+        # drop cached balances (and this symbol's ticker, or all tickers) after a fill
+        if symbol is None:
+            self.cache.invalidate()
+            self.inflight.forget()
+        else:
+            self.cache.invalidate(lambda k: k[0] == "fetch_balance" or k == ("fetch_ticker", symbol))
+            self.inflight.forget(("fetch_balance",))
+            self.inflight.forget(("fetch_ticker", symbol))
+
+    def market_meta(self, symbol: str) -> Dict[str, Any]:
+        return self.index.meta(symbol)
+
+    async def _ccxt_ohlcv(self, symbol, timeframe, limit, since):
+        return await self.ex.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = "1m", limit: int = 200, since: int = None):
+        return await self._request("fetch_ohlcv", ("fetch_ohlcv", symbol, timeframe, limit, since),
+                                   self._ccxt_ohlcv, symbol, timeframe, limit, since)
+
+    async def fetch_ohlcv_many(self, symbols, timeframe: str = "1m", limit: int = 200):
+        # one round trip for N symbols; failures come back as exceptions in place of rows
+        rows = await asyncio.gather(*(self.fetch_ohlcv(s, timeframe, limit) for s in symbols),
+                                    return_exceptions=True)
+        return dict(zip(symbols, rows))
+
+    async def fetch_balance(self):
+        if self.mode in ("paper", "backtest"):
+            return self.ledger.balance()
+        return await self._request("fetch_balance", ("fetch_balance",),
+                                   self.ex.fetch_balance, cached=True)
+
+    async def fetch_ticker(self, symbol: str):
+        return await self._request("fetch_ticker", ("fetch_ticker", symbol),
+                                   self.ex.fetch_ticker, symbol, cached=True)
+
+    async def create_market_order(self, symbol: str, side: str, amount: float,
+                                  client_id: str = None):
+        await self.limiter.acquire(self.weights.get("create_order", 1))
+        if self._sync is not None:
+            return await self._offload(self._sync.create_market_order, symbol, side, amount, client_id)
+        params = {"clientOrderId": client_id} if client_id else {}
+        return await self.ex.create_order(symbol, "market", side, amount, None, params)
+
+    async def fetch_orders(self, symbol: str, since: int = None):
+        # open and recently closed orders of one symbol: OrderManager's batched status poll
+        return await self._request("fetch_orders", ("fetch_orders", symbol, since),
+                                   self.ex.fetch_orders, symbol, since)
+
+    async def fetch_open_orders(self, symbol: str = None):
+        return await self._request("fetch_open_orders", ("fetch_open_orders", symbol),
+                                   self.ex.fetch_open_orders, symbol)
@@ -0,0 +1,292 @@
+import math
+import numpy as np
+from typing import Dict, Iterable, Optional
+
+# Streaming indicators. Each one supports push() for a new bar and amend() to revise the
+# newest bar in place (a still-forming candle), both O(1) regardless of lookback.
+
+
+class RollingWindow:
+    # rolling sum / sum of squares over the last n values, resynced every n pushes to bound drift
+    def __init__(self, n: int):
+        self.n = max(1, int(n))
+        self._buf = np.zeros(self.n, dtype="float64")
+        self._i = 0
+        self._pushes = 0
+        self.count = 0
+        self.sum = 0.0
+        self.sumsq = 0.0
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.n
+
+    def push(self, x: float):
+        old = self._buf[self._i] if self.full else 0.0
+        self._buf[self._i] = x
+        self._i = (self._i + 1) % self.n
+        self.count = min(self.count + 1, self.n)
+        self.sum += x - old
+        self.sumsq += x * x - old * old
+        self._pushes += 1
+        if self._pushes % self.n == 0:
+            w = self._buf[:self.count]
+            self.sum, self.sumsq = float(w.sum()), float((w * w).sum())
+
+    def amend(self, x: float):
+        j = (self._i - 1) % self.n
+        old = self._buf[j]
+        self._buf[j] = x
+        self.sum += x - old
+        self.sumsq += x * x - old * old
+
+
+class SMA:
+    def __init__(self, n: int):
+        self.w = RollingWindow(n)
+
+    def push(self, x: float):
+        self.w.push(x)
+
+    def amend(self, x: float):
+        self.w.amend(x)
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.w.sum / self.w.n if self.w.full else None
+
+
+class EMA:
+    def __init__(self, n: int):
+        self.n = max(1, int(n))
+        self.alpha = 2.0 / (self.n + 1)
+        self._count = 0
+        self._prev = None  # ema before the newest bar
+        self._value = None
+
+    def _step(self, x: float) -> float:
+        return x if self._prev is None else self._prev + self.alpha * (x - self._prev)
+
+    def push(self, x: float):
+        self._prev = self._value
+        self._value = self._step(x)
+        self._count += 1
+
+    def amend(self, x: float):
+        if self._count:
+            self._value = self._step(x)
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._value if self._count >= self.n else None
+
+
+class RollingStd:
+    # sample (ddof=1) rolling standard deviation, matching pandas rolling().std()
+    def __init__(self, n: int):
+        self.w = RollingWindow(max(2, int(n)))
+
+    def push(self, x: float):
+        self.w.push(x)
+
+    def amend(self, x: float):
+        self.w.amend(x)
+
+    @property
+    def value(self) -> Optional[float]:
+        w = self.w
+        if not w.full:
+            return None
+        var = (w.sumsq - w.sum * w.sum / w.n) / (w.n - 1)
+        return math.sqrt(max(0.0, var))
+
+
+class ATR:
+    # Wilder's average true range, seeded with the simple mean of the first n true ranges
+    def __init__(self, n: int = 14):
+        self.n = max(1, int(n))
+        self._count = 0
+        self._prev_close = None  # close of the bar before the newest one
+        self._last_close = None
+        self._prev_atr = None
+        self._atr = None
+        self._seed = 0.0
+        self._last_tr = 0.0
+
+    def _tr(self, high: float, low: float) -> float:
+        if self._prev_close is None:
+            return high - low
+        return max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+
+    def _apply(self, tr: float):
+        if self._count < self.n:
+            self._atr = None
+        elif self._count == self.n:
+            self._atr = (self._seed + tr) / self.n
+        else:
+            self._atr = (self._prev_atr * (self.n - 1) + tr) / self.n
+
+    def push(self, high: float, low: float, close: float):
+        self._seed += self._last_tr if 0 < self._count < self.n else 0.0
+        self._prev_close, self._prev_atr = self._last_close, self._atr
+        self._count += 1
+        self._last_tr = self._tr(high, low)
+        self._apply(self._last_tr)
+        self._last_close = close
+
+    def amend(self, high: float, low: float, close: float):
+        if not self._count:
+            return
+        self._last_tr = self._tr(high, low)
+        self._apply(self._last_tr)
+        self._last_close = close
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._atr
+
+
+class VWAP:
+    # rolling volume-weighted typical price over the last n bars
+    def __init__(self, n: int):
+        self.pv = RollingWindow(n)
+        self.v = RollingWindow(n)
+
+    def push(self, high: float, low: float, close: float, volume: float):
+        self.pv.push((high + low + close) / 3.0 * volume)
+        self.v.push(volume)
+
+    def amend(self, high: float, low: float, close: float, volume: float):
+        self.pv.amend((high + low + close) / 3.0 * volume)
+        self.v.amend(volume)
+
+    @property
+    def value(self) -> Optional[float]:
+        if not self.v.full or self.v.sum <= 0:
+            return None
+        return self.pv.sum / self.v.sum
+
+
+def _f(x) -> Optional[float]:
+    return None if x is None else float(x)
+
+
+class IndicatorSet:
+    # per-symbol indicator state; `prev` holds the values as of the bar before the newest one
+    FIELDS = ("close", "sma_fast", "sma_slow", "ema", "std", "atr", "vwap")
+
+    def __init__(self, fast: int = 20, slow: int = 50, ema: int = 20, std: int = 20,
+                 atr: int = 14, vwap: int = 20):
+        self.sma_fast = SMA(fast)
+        self.sma_slow = SMA(slow)
+        self.ema = EMA(ema)
+        self.std = RollingStd(std)
+        self.atr = ATR(atr)
+        self.vwap = VWAP(vwap)
+        self.ts = [None, None]
+        self.prev: Dict[str, Optional[float]] = dict.fromkeys(self.FIELDS)
+        self.now: Dict[str, Optional[float]] = dict.fromkeys(self.FIELDS)
+
+    def update(self, row, kind: str):
+        # row is (ts, open, high, low, close, volume); kind is "append" or "update"
+        ts, _, high, low, close, volume = row
+        if kind == "append":
+            self.prev = self.now
+            self.ts = [self.ts[1], int(ts)]
+            for ind in (self.sma_fast, self.sma_slow, self.ema, self.std):
+                ind.push(close)
+            self.atr.push(high, low, close)
+            self.vwap.push(high, low, close, volume)
+        elif kind == "update":
+            for ind in (self.sma_fast, self.sma_slow, self.ema, self.std):
+                ind.amend(close)
+            self.atr.amend(high, low, close)
+            self.vwap.amend(high, low, close, volume)
+        else:
+            return
+        self.now = {"close": float(close), "sma_fast": _f(self.sma_fast.value),
+                    "sma_slow": _f(self.sma_slow.value), "ema": _f(self.ema.value),
+                    "std": _f(self.std.value), "atr": _f(self.atr.value), "vwap": _f(self.vwap.value)}
+
+    def features(self) -> Dict[str, list]:
+        # last two rows, column-oriented, in the shape StrategyAgent expects
+        out = {"ts": list(self.ts)}
+        for k in self.FIELDS:
+            out[k] = [self.prev[k], self.now[k]]
+        return out
+
+
+# Whole-history equivalents of IndicatorSet's columns for backtests: one array per field, NaN
+# where the streaming indicator is still warming up (None).
+
+def rolling_mean(x: np.ndarray, n: int) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if n <= 0 or len(x) < n:
+        return out
+    c = np.cumsum(np.insert(x.astype("float64"), 0, 0.0))
+    out[n - 1:] = (c[n:] - c[:-n]) / n
+    return out
+
+
+def rolling_std(x: np.ndarray, n: int) -> np.ndarray:
+    n = max(2, int(n))
+    m = rolling_mean(x, n)
+    m2 = rolling_mean(x * x, n)
+    return np.sqrt(np.maximum(0.0, (m2 - m * m) * n / (n - 1)))
+
+
+def ema_series(x: np.ndarray, n: int) -> np.ndarray:
+    n = max(1, int(n))
+    alpha = 2.0 / (n + 1)
+    out = np.full(len(x), np.nan)
+    v = None
+    for i, xi in enumerate(x.tolist()):
+        v = xi if v is None else v + alpha * (xi - v)
+        if i >= n - 1:
+            out[i] = v
+    return out
+
+
+def atr_series(high: np.ndarray, low: np.ndarray, close: np.ndarray, n: int = 14) -> np.ndarray:
+    n = max(1, int(n))
+    prev = np.concatenate(([np.nan], close[:-1]))
+    with np.errstate(invalid="ignore"):
+        tr = np.fmax(high - low, np.fmax(np.abs(high - prev), np.abs(low - prev)))
+    out = np.full(len(tr), np.nan)
+    if len(tr) < n:
+        return out
+    a = float(tr[:n].mean())
+    out[n - 1] = a
+    for i in range(n, len(tr)):
+        a = (a * (n - 1) + tr[i]) / n
+        out[i] = a
+    return out
+
+
+def vwap_series(high, low, close, volume, n: int = 20) -> np.ndarray:
+    pv = rolling_mean((high + low + close) / 3.0 * volume, n)
+    v = rolling_mean(volume, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(v > 0, pv / v, np.nan)
+
+
+def batch_features(bars: Dict[str, np.ndarray], fields: Iterable[str] = IndicatorSet.FIELDS,
+                   fast: int = 20, slow: int = 50, ema: int = 20, std: int = 20, atr: int = 14,
+                   vwap: int = 20) -> Dict[str, np.ndarray]:
+    # only the requested fields are computed; bars need the OHLCV columns those fields read
+    col = {k: np.asarray(v, dtype="int64" if k == "ts" else "float64") for k, v in bars.items()}
+    close = col["close"]
+    make = {
+        "close": lambda: close,
+        "sma_fast": lambda: rolling_mean(close, fast),
+        "sma_slow": lambda: rolling_mean(close, slow),
+        "ema": lambda: ema_series(close, ema),
+        "std": lambda: rolling_std(close, std),
+        "atr": lambda: atr_series(col["high"], col["low"], close, atr),
+        "vwap": lambda: vwap_series(col["high"], col["low"], close, col["volume"], vwap),
+    }
+    out = {"ts": col["ts"]} if "ts" in col else {}
+    for f in fields:
+        out[f] = make[f]() if f in make else col[f]
+    return out
+
@@ -0,0 +1,141 @@
+import glob, mmap, os, pickle, struct, time
+from typing import Any, Iterator, List, Optional, Tuple
+from .codec import decode, encode
+
+# Append-only event journal in preallocated, memory-mapped segment files. A record is
+# u32 length | u64 seq | codec-encoded event; the header is written after the body, so a torn
+# record reads as zeros and marks the end of the log. snapshot() stores a compacted state as of a
+# seq and deletes the segments it covers, so recovery reads one snapshot plus the tail after it.
+
+_REC = struct.Struct("<IQ")
+
+
+def _seq_of(path: str) -> int:
+    # journal-<first seq>.log / snapshot-<seq>.pkl
+    return int(os.path.basename(path).split("-", 1)[1].split(".", 1)[0])
+
+
+def _records(buf) -> Iterator[Tuple[int, int, int]]:
+    # (seq, body offset, end offset) of each complete record
+    off, n = 0, len(buf)
+    while off + _REC.size <= n:
+        length, seq = _REC.unpack_from(buf, off)
+        end = off + _REC.size + length
+        if not length or end > n:
+            return
+        yield seq, off + _REC.size, end
+        off = end
+
+
+class Journal:
+    def __init__(self, root: str, segment_bytes: int = 64 << 20, sync_interval: float = 1.0):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.segment_bytes = segment_bytes
+        self.sync_interval = sync_interval  # msync at most this often; the page cache survives a process crash
+        self.seq = 0
+        self._mm: Optional[mmap.mmap] = None
+        self._f = None
+        self._pos = 0
+        self._size = 0
+        self._synced = time.monotonic()
+        segs = self.segments()
+        if segs:
+            self._map(segs[-1])
+            self.seq = _seq_of(segs[-1]) - 1
+            for seq, _, end in _records(self._mm):
+                self.seq, self._pos = seq, end
+        snaps = self._snapshots()
+        if snaps:
+            self.seq = max(self.seq, _seq_of(snaps[-1]))
+
+    def segments(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.root, "journal-*.log")), key=_seq_of)
+
+    def _snapshots(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.root, "snapshot-*.pkl")), key=_seq_of)
+
+    def _map(self, path: str, size: int = None):
+        self._close_map()
+        if size is not None:
+            with open(path, "wb") as f:
+                f.truncate(size)
+        self._f = open(path, "r+b")
+        self._size = os.fstat(self._f.fileno()).st_size
+        self._mm = mmap.mmap(self._f.fileno(), self._size)
+        self._pos = 0
+
+    def _close_map(self):
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm.close()
+            self._f.close()
+            self._mm = self._f = None
+
+    def append(self, ev) -> int:
+        body = encode(ev)
+        need = _REC.size + len(body)
+        if self._mm is None or self._pos + need > self._size:
+            path = os.path.join(self.root, "journal-%020d.log" % (self.seq + 1))
+            self._map(path, max(self.segment_bytes, need + _REC.size))
+        self.seq += 1
+        start = self._pos + _REC.size
+        self._mm[start:start + len(body)] = body
+        _REC.pack_into(self._mm, self._pos, len(body), self.seq)
+        self._pos += need
+        if time.monotonic() - self._synced >= self.sync_interval:
+            self.flush()
+        return self.seq
+
+    def flush(self):
+        if self._mm is not None:
+            self._mm.flush()
+        self._synced = time.monotonic()
+
+    def replay(self, after: int = 0) -> Iterator[Tuple[int, Any]]:
+        # (seq, event) for every record after `after`, oldest first; skips segments wholly before it
+        segs = self.segments()
+        for i, path in enumerate(segs):
+            if i + 1 < len(segs) and _seq_of(segs[i + 1]) <= after + 1:
+                continue
+            with open(path, "rb") as f:
+                if not os.fstat(f.fileno()).st_size:
+                    continue
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    events = [(seq, decode(mm[a:b])) for seq, a, b in _records(mm) if seq > after]
+            yield from events
+
+    def snapshot(self, state: Any, seq: int = None):
+        # state as of `seq` (default: everything appended so far); older snapshots and the
+        # segments they cover are deleted
+        seq = self.seq if seq is None else seq
+        self.flush()
+        path = os.path.join(self.root, "snapshot-%020d.pkl" % seq)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((seq, state), f, protocol=5)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        for old in self._snapshots():
+            if old != path:
+                os.remove(old)
+        segs = self.segments()
+        for i, seg in enumerate(segs[:-1]):
+            if _seq_of(segs[i + 1]) <= seq + 1:
+                os.remove(seg)
+
+    def load_snapshot(self) -> Tuple[int, Any]:
+        snaps = self._snapshots()
+        if not snaps:
+            return 0, None
+        with open(snaps[-1], "rb") as f:
+            return pickle.load(f)
+
+    def recover(self) -> Tuple[int, Any, List[Any]]:
+        # (snapshot seq, snapshot state or None, events after it)
+        seq, state = self.load_snapshot()
+        return seq, state, [ev for _, ev in self.replay(seq)]
+
+    def close(self):
+        self._close_map()
@@ -0,0 +1,83 @@
+import time
+from typing import Dict, List
+
+class Ledger:
+    # Authoritative in-memory cash and positions. Fills update it in O(1); the Store only
+    # receives snapshots of what changed since the last one.
+    def __init__(self, quote: str = "USDT", cash: float = 0.0):
+        self.quote = quote
+        self.cash = float(cash)
+        self.positions: Dict[str, List[float]] = {}  # symbol -> [qty, avg_price]
+        self._bases: Dict[str, float] = {}           # base asset -> total qty
+        self._dirty = set()
+        self._cash_dirty = False
+        self.last_snapshot = time.time()
+
+    @classmethod
+    def load(cls, store, quote: str = "USDT") -> "Ledger":
+        led = cls(quote, float(store.get_meta(f"cash_{quote}", "0") or 0))
+        for sym, qty, avg in store.get_positions():
+            led.positions[sym] = [float(qty), float(avg)]
+            base = sym.split("/")[0]
+            led._bases[base] = led._bases.get(base, 0.0) + float(qty)
+        return led
+
+    def qty(self, symbol: str) -> float:
+        p = self.positions.get(symbol)
+        return p[0] if p else 0.0
+
+    def apply_fill(self, symbol: str, side: str, amount: float, price: float, track_cash: bool = True):
+        p = self.positions.get(symbol)
+        if p is None:
+            p = self.positions[symbol] = [0.0, 0.0]
+        qty, avg = p
+        if side == "buy":
+            new_qty = qty + amount
+            p[1] = (qty*avg + amount*price) / new_qty if new_qty > 0 else 0.0
+            delta = amount
+        else:
+            new_qty = qty - amount
+            delta = -amount
+        p[0] = new_qty
+        base = symbol.split("/")[0]
+        self._bases[base] = self._bases.get(base, 0.0) + delta
+        if track_cash:
+            self.cash -= delta * price
+            self._cash_dirty = True
+        self._dirty.add(symbol)
+        return p[0], p[1]
+
+    def balance(self) -> Dict[str, Dict[str, float]]:
+        # ccxt-shaped balance, as ExchangeClient.fetch_balance returns in paper mode
+        totals = dict(self._bases)
+        totals[self.quote] = totals.get(self.quote, 0.0) + self.cash
+        return {"total": totals}
+
+    def equity(self, prices: Dict[str, float]) -> float:
+        return self.cash + sum(q * prices.get(sym, avg) for sym, (q, avg) in self.positions.items())
+
+    def snapshot(self, store):
+        if self._cash_dirty:
+            store.set_meta(f"cash_{self.quote}", repr(self.cash))
+        for sym in self._dirty:
+            store.upsert_position(sym, *self.positions[sym])
+        self._dirty.clear()
+        self._cash_dirty = False
+        self.last_snapshot = time.time()
+
+    def state(self) -> Dict:
+        return {"quote": self.quote, "cash": self.cash,
+                "positions": {s: list(p) for s, p in self.positions.items()}}
+
+    def restore(self, state: Dict):
+        # in place, so clients sharing this ledger see the recovered state; all of it is dirty
+        self.quote = state.get("quote", self.quote)
+        self.cash = float(state["cash"])
+        self.positions.clear()
+        self._bases.clear()
+        for sym, (qty, avg) in state["positions"].items():
+            self.positions[sym] = [float(qty), float(avg)]
+            base = sym.split("/")[0]
+            self._bases[base] = self._bases.get(base, 0.0) + float(qty)
+        self._dirty = set(self.positions)
+        self._cash_dirty = True
@@ -1,11 +1,118 @@
-import logging, sys
-from rich.logging import RichHandler
-
-def setup_logging(level: str = "INFO"):
-    logging.basicConfig(
-        level=getattr(logging, level.upper(), logging.INFO),
-        format="%(message)s",
-        datefmt="%H:%M:%S",
-        handlers=[RichHandler(rich_tracebacks=True, markup=True, stream=sys.stdout)],
-    )
-    return logging.getLogger("trader")
\ No newline at end of file
+import atexit, json, logging, logging.handlers, queue, sys
+from typing import Dict, Optional
+
+# mode="rich": console output through RichHandler, written synchronously by the calling thread.
+# mode="queue": the calling thread only samples the record and puts it on an in-process queue;
+# a QueueListener thread formats JSON lines and writes them to a rotating file (or stdout).
+# Records can carry a `topic` extra (logger.info(..., extra={"topic": "bar"})) for sampling.
+
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+_listener: Optional[logging.handlers.QueueListener] = None
+_saved_flags: Optional[tuple] = None  # logging's per-record lookup switches, restored by stop_logging()
+_atexit_registered = False
+
+
+class JsonFormatter(logging.Formatter):
+    # one object per line: ts, level, logger, msg, any extra fields, exc for tracebacks
+    def format(self, record: logging.LogRecord) -> str:
+        out = {"ts": record.created, "level": record.levelname, "logger": record.name, "msg": record.getMessage()}
+        for k, v in record.__dict__.items():
+            if k not in _RECORD_ATTRS:
+                out[k] = v
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            out["exc"] = record.exc_text
+        return json.dumps(out, default=str)
+
+
+class TopicSampler(logging.Filter):
+    # keeps the first of every n records per topic ({"bar": 100}); WARNING and above always pass
+    def __init__(self, rates: Dict[str, int]):
+        super().__init__()
+        self.rates = {t: int(n) for t, n in rates.items() if int(n) > 1}
+        self.seen: Dict[str, int] = dict.fromkeys(self.rates, 0)
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        n = self.rates.get(getattr(record, "topic", None))
+        if n is None or record.levelno >= logging.WARNING:
+            return True
+        t = record.topic
+        keep = self.seen[t] % n == 0
+        self.seen[t] += 1
+        self.dropped += not keep
+        return keep
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    # the stock prepare() runs the full formatter on the caller's thread; this only resolves
+    # the message (args may be mutated after the call) and traceback text, on a copy as other
+    # handlers may see the same record
+    def prepare(self, original: logging.LogRecord) -> logging.LogRecord:
+        # shallow copy, as copy.copy() would make it, without the pickle-protocol round trip
+        record = logging.LogRecord.__new__(logging.LogRecord)
+        record.__dict__.update(original.__dict__)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def stop_logging():
+    # flushes and stops the queue writer and restores logging's lookup switches; safe to call
+    # more than once
+    global _listener, _saved_flags
+    if _listener is not None:
+        _listener.stop()
+        for h in _listener.handlers:
+            h.close()
+        _listener = None
+    if _saved_flags is not None:
+        logging._srcfile, logging.logThreads, logging.logProcesses, logging.logMultiprocessing = _saved_flags
+        _saved_flags = None
+
+
+def setup_logging(level: str = "INFO", mode: str = "rich", path: Optional[str] = None,
+                  sample: Optional[Dict[str, int]] = None, max_bytes: int = 50 << 20,
+                  backups: int = 5, when: Optional[str] = None):
+    lvl = getattr(logging, level.upper(), logging.INFO)
+    if mode != "queue":
+        from rich.logging import RichHandler
+        logging.basicConfig(
+            level=lvl,
+            format="%(message)s",
+            datefmt="%H:%M:%S",
+            handlers=[RichHandler(rich_tracebacks=True, markup=True, stream=sys.stdout)],
+        )
+        return logging.getLogger("trader")
+
+    # rotation by size, or by time with when= ("midnight", "H", ...)
+    stop_logging()
+    if path is None:
+        out = logging.StreamHandler(sys.stdout)
+    elif when:
+        out = logging.handlers.TimedRotatingFileHandler(path, when=when, backupCount=backups, delay=True)
+    else:
+        out = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, delay=True)
+    out.setFormatter(JsonFormatter())
+    # JSON lines carry no caller/thread/process fields, so skip the stack walk and lookups per record
+    global _saved_flags, _atexit_registered
+    _saved_flags = (logging._srcfile, logging.logThreads, logging.logProcesses, logging.logMultiprocessing)
+    logging._srcfile = None
+    logging.logThreads = logging.logProcesses = logging.logMultiprocessing = False
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _QueueHandler(q)
+    if sample:
+        handler.addFilter(TopicSampler(sample))
+    global _listener
+    _listener = logging.handlers.QueueListener(q, out, respect_handler_level=True)
+    _listener.start()
+    if not _atexit_registered:
+        atexit.register(stop_logging)
+        _atexit_registered = True
+    logging.basicConfig(level=lvl, handlers=[handler], force=True)
+    return logging.getLogger("trader")
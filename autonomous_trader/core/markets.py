@@ -0,0 +1,78 @@
+import os, time
+import numpy as np
+from typing import Any, Dict, Optional
+
+# Per-symbol trading constraints as one float64 table (NaN = unknown step/tick), built from ccxt's
+# nested `markets` dict once per refresh instead of on every gate check.
+
+META_FIELDS = ("min_notional", "step", "tick", "taker", "maker")
+_DEFAULT = (0.0, np.nan, np.nan, 0.001, 0.001)
+
+
+def _market_row(m: Dict[str, Any]) -> tuple:
+    limits = m.get("limits") or {}
+    precision = m.get("precision") or {}
+    row = ((limits.get("cost") or {}).get("min") or 0.0, precision.get("amount"), precision.get("price"),
+           m.get("taker", 0.001), m.get("maker", 0.001))
+    return tuple(np.nan if v is None else float(v) for v in row)
+
+
+def _as_meta(row) -> Dict[str, Any]:
+    # the dict shape micro_cap_gate expects; unknown step/tick stay None
+    return {k: (None if v != v else float(v)) for k, v in zip(META_FIELDS, row)}
+
+
+class MarketIndex:
+    def __init__(self, symbols=(), table=None, built_at: float = 0.0):
+        self.symbols = [str(s) for s in symbols]
+        self.table = np.asarray(table if table is not None else np.empty((0, len(META_FIELDS))),
+                                dtype="float64").reshape(-1, len(META_FIELDS))
+        self.built_at = float(built_at)
+        self._rows = {s: i for i, s in enumerate(self.symbols)}
+        self._meta = {s: _as_meta(self.table[i]) for i, s in enumerate(self.symbols)}
+        self._default = _as_meta(_DEFAULT)
+
+    @classmethod
+    def from_markets(cls, markets: Dict[str, Any]) -> "MarketIndex":
+        symbols = sorted(markets)
+        return cls(symbols, [_market_row(markets[s]) for s in symbols], time.time())
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._rows
+
+    def row(self, symbol: str) -> Optional[int]:
+        return self._rows.get(symbol)
+
+    def column(self, field: str) -> np.ndarray:
+        return self.table[:, META_FIELDS.index(field)]
+
+    def meta(self, symbol: str) -> Dict[str, Any]:
+        # one dict lookup; callers must not mutate the returned dict
+        return self._meta.get(symbol, self._default)
+
+    def age(self) -> float:
+        return time.time() - self.built_at if self.built_at else float("inf")
+
+    def replace(self, other: "MarketIndex"):
+        # swap in a refreshed index; readers see either the old or the new table, never a mix
+        self.__dict__.update(other.__dict__)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, symbols=np.array(self.symbols, dtype=str), table=self.table,
+                 built_at=np.float64(self.built_at))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> Optional["MarketIndex"]:
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as z:
+                return cls(z["symbols"].tolist(), z["table"], float(z["built_at"]))
+        except (OSError, ValueError, KeyError):
+            return None
@@ -0,0 +1,226 @@
+import math
+from typing import Any, Dict, Optional
+import numpy as np
+import pandas as pd
+from .indicators import RollingWindow
+
+# Performance analytics over whole arrays: an equity curve (ts in seconds, equity) and a trade
+# table (ts, symbol, side, qty, price, fees; Store rows, a DataFrame or a dict of arrays). Trade
+# PnL is attributed to the holding period after each trade, so it sums exactly to the book's
+# PnL at `last_price` without any FIFO lot matching. RollingMetrics keeps the same numbers
+# for a live run in O(1) per update.
+
+YEAR_SEC = 365 * 86400.0  # crypto trades around the clock
+TRADE_COLUMNS = ("ts", "symbol", "side", "qty", "price", "fees")  # Store.get_trades() rows
+
+
+def simple_returns(equity) -> np.ndarray:
+    e = np.asarray(equity, dtype="float64")
+    if len(e) < 2:
+        return np.zeros(0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(e[:-1] != 0, e[1:] / e[:-1] - 1.0, 0.0)
+
+
+def periods_per_year(ts) -> float:
+    dt = np.diff(np.asarray(ts, dtype="float64"))
+    dt = dt[dt > 0]
+    return YEAR_SEC / float(np.median(dt)) if len(dt) else 1.0
+
+
+def sharpe(returns, periods: float) -> float:
+    r = np.asarray(returns, dtype="float64")
+    sd = r.std(ddof=1) if len(r) > 1 else 0.0
+    return float(r.mean() / sd * math.sqrt(periods)) if sd > 0 else 0.0
+
+
+def sortino(returns, periods: float) -> float:
+    r = np.asarray(returns, dtype="float64")
+    if not len(r):
+        return 0.0
+    down = math.sqrt(float(np.mean(np.minimum(r, 0.0) ** 2)))
+    return float(r.mean() / down * math.sqrt(periods)) if down > 0 else 0.0
+
+
+def max_drawdown(equity: np.ndarray) -> float:
+    # largest peak-to-trough fall as a fraction of the peak
+    if not len(equity):
+        return 0.0
+    peak = np.maximum.accumulate(equity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dd = np.where(peak > 0, (peak - equity) / peak, 0.0)
+    return float(dd.max())
+
+
+def trade_arrays(trades) -> Dict[str, np.ndarray]:
+    # normalize Store rows / DataFrame / dict: side may be "buy"/"sell" or +1/-1, qty may be
+    # named amount (BacktestResult.trades); symbol defaults to one unnamed market
+    if isinstance(trades, list):
+        trades = pd.DataFrame(trades, columns=list(TRADE_COLUMNS))
+    if "dq" in trades:
+        return trades
+    get = trades.get
+    qty = np.abs(np.asarray(get("qty") if get("qty") is not None else get("amount"), dtype="float64"))
+    n = len(qty)
+    side = np.asarray(get("side"))
+    sign = np.sign(side.astype("float64")) if side.dtype.kind in "iuf" else np.where(side == "buy", 1.0, -1.0)
+    sym = get("symbol")
+    codes, names = pd.factorize(np.asarray(sym)) if sym is not None else (np.zeros(n, "int64"), np.array([""]))
+    fees = get("fees")
+    return {"ts": np.asarray(get("ts"), dtype="float64"), "code": np.asarray(codes, dtype="int64"),
+            "names": np.asarray(names, dtype=object), "dq": sign * qty,
+            "price": np.asarray(get("price"), dtype="float64"),
+            "fees": np.zeros(n) if fees is None else np.nan_to_num(np.asarray(fees, dtype="float64"))}
+
+
+def attribution(trades, last_price: Optional[Dict[str, float]] = None, end_ts: Optional[float] = None) -> Dict[str, Any]:
+    # per trade, in input order: position after it and the PnL of holding that position until the
+    # next trade in the symbol (or `last_price`, else flat-marked at its own price) net of its fee;
+    # per round trip (flat to flat, per symbol): PnL, open/close ts, closed flag. Needs at least
+    # one trade.
+    t = trade_arrays(trades)
+    n = len(t["dq"])
+    if (t["ts"][1:] >= t["ts"][:-1]).all():
+        # already in time order (Store, backtests): a stable sort by symbol keeps it; 16-bit keys
+        # take NumPy's radix sort
+        key = t["code"].astype("int16") if len(t["names"]) < 1 << 15 else t["code"]
+        order = np.argsort(key, kind="stable")
+    else:
+        order = np.lexsort((t["ts"], t["code"]))
+    code, ts, dq, px = t["code"][order], t["ts"][order], t["dq"][order], t["price"][order]
+    pos = pd.Series(dq).groupby(code).cumsum().to_numpy(copy=True)
+    pos[np.abs(pos) <= 1e-9 * max(1.0, float(np.abs(dq).max()))] = 0.0  # cumsum rounding
+    first = np.r_[True, code[1:] != code[:-1]]
+    last = np.r_[first[1:], True]
+    nxt_px = np.r_[px[1:], 0.0]
+    nxt_ts = np.r_[ts[1:], 0.0]
+    marks = np.array([(last_price or {}).get(s, np.nan) for s in t["names"]])[code[last]]
+    nxt_px[last] = np.where(np.isfinite(marks), marks, px[last])
+    end = float(ts.max()) if end_ts is None else end_ts
+    nxt_ts[last] = end
+    pnl = pos * (nxt_px - px) - t["fees"][order]
+
+    flat_before = np.r_[True, pos[:-1] == 0]
+    starts = np.flatnonzero(first | flat_before)
+    ends = np.r_[starts[1:], n] - 1
+    out_pnl = np.empty(n)
+    out_pos = np.empty(n)
+    out_pnl[order], out_pos[order] = pnl, pos
+    # holding intervals [ts, next ts) where a position is open, back-to-back ones merged
+    held = pos != 0
+    run_start = held & ~np.r_[False, held[:-1] & ~first[1:]]
+    run_end = held & ~np.r_[held[1:] & ~last[:-1], False]
+    return {
+        "pnl": out_pnl, "position": out_pos,
+        "symbols": t["names"], "fees": float(t["fees"].sum()), "notional": float(np.abs(dq * px).sum()),
+        "trip_symbol": t["names"][code[starts]], "trip_pnl": np.add.reduceat(pnl, starts),
+        "trip_open_ts": ts[starts], "trip_close_ts": ts[ends], "trip_closed": pos[ends] == 0,
+        "exposure_sec": _covered(ts[run_start], nxt_ts[run_end]),
+        "span": (float(ts.min()), end),
+    }
+
+
+def _covered(starts: np.ndarray, ends: np.ndarray) -> float:
+    # total length of the union of [start, end) intervals
+    if not len(starts):
+        return 0.0
+    t = np.concatenate((starts, ends))
+    d = np.concatenate((np.ones(len(starts)), -np.ones(len(ends))))
+    o = np.lexsort((d, t))  # ends before starts at equal times
+    t, open_ = t[o], np.cumsum(d[o])
+    return float(np.sum(np.diff(t) * (open_[:-1] > 0)))
+
+
+def report(trades=None, equity=None, ts=None, periods: Optional[float] = None,
+           last_price: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    span = None
+    if equity is not None and len(equity):
+        e = np.asarray(equity, dtype="float64")
+        periods = periods or (periods_per_year(ts) if ts is not None else 1.0)
+        r = simple_returns(e)
+        out.update({"start_equity": float(e[0]), "end_equity": float(e[-1]),
+                    "total_return": float(e[-1] / e[0] - 1.0) if e[0] else 0.0,
+                    "sharpe": sharpe(r, periods), "sortino": sortino(r, periods),
+                    "max_drawdown": max_drawdown(e)})
+        if ts is not None:
+            span = (float(ts[0]), float(ts[-1]))
+    t = trade_arrays(trades) if trades is not None and len(trades) else None
+    if t is not None and len(t["dq"]):
+        a = attribution(t, last_price, span[1] if span else None)
+        span = span or a["span"]
+        closed = a["trip_pnl"][a["trip_closed"]]
+        mean_eq = float(np.mean(equity)) if equity is not None and len(equity) else 0.0
+        out.update({"trades": float(len(a["pnl"])), "pnl": float(a["pnl"].sum()), "fees": a["fees"],
+                    "turnover": a["notional"] / mean_eq if mean_eq else 0.0,
+                    "exposure_time": a["exposure_sec"] / (span[1] - span[0]) if span[1] > span[0] else 0.0,
+                    "round_trips": float(len(closed)),
+                    "win_rate": float(np.mean(closed > 0)) if len(closed) else 0.0,
+                    "avg_trip_pnl": float(closed.mean()) if len(closed) else 0.0})
+    return out
+
+
+def store_report(store, mode: Optional[str] = None, **kw) -> Dict[str, float]:
+    eq = store.get_equity()
+    tr = store.get_trades(mode)
+    e = np.asarray(eq, dtype="float64").reshape(-1, 2)
+    return report(tr, e[:, 1], e[:, 0], **kw)
+
+
+class RollingMetrics:
+    # streaming Sharpe / Sortino over the last `window` equity returns plus drawdown and turnover
+    # since start, O(1) per update; periods per year follow the spacing of the first two ts
+    def __init__(self, window: int = 500, periods: Optional[float] = None):
+        self.periods = periods
+        self.returns = RollingWindow(window)
+        self.downside = RollingWindow(window)
+        self.equity = None
+        self.peak = 0.0
+        self.max_drawdown = 0.0
+        self.traded = 0.0
+        self.updates = 0
+        self._ts = None
+        self._eq_sum = 0.0
+
+    def update(self, equity: float, ts: Optional[float] = None):
+        if self.periods is None and ts is not None and self._ts is not None and ts > self._ts:
+            self.periods = YEAR_SEC / (ts - self._ts)
+        self._ts = ts
+        if self.equity:
+            r = equity / self.equity - 1.0
+            self.returns.push(r)
+            self.downside.push(min(r, 0.0))
+        self.equity = equity
+        self.peak = max(self.peak, equity)
+        if self.peak > 0:
+            self.max_drawdown = max(self.max_drawdown, (self.peak - equity) / self.peak)
+        self.updates += 1
+        self._eq_sum += equity
+
+    def add_trade(self, notional: float):
+        self.traded += abs(notional)
+
+    @property
+    def drawdown(self) -> float:
+        return (self.peak - self.equity) / self.peak if self.peak > 0 else 0.0
+
+    @property
+    def sharpe(self) -> float:
+        w = self.returns
+        n = w.count
+        if n < 2:
+            return 0.0
+        var = (w.sumsq - w.sum * w.sum / n) / (n - 1)
+        return float(w.sum / n / math.sqrt(var) * math.sqrt(self.periods or 1.0)) if var > 0 else 0.0
+
+    @property
+    def sortino(self) -> float:
+        n = self.returns.count
+        down = math.sqrt(self.downside.sumsq / n) if n else 0.0
+        return float(self.returns.sum / n / down * math.sqrt(self.periods or 1.0)) if down > 0 else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        mean_eq = self._eq_sum / self.updates if self.updates else 0.0
+        return {"equity": self.equity or 0.0, "sharpe": self.sharpe, "sortino": self.sortino,
+                "drawdown": self.drawdown, "max_drawdown": self.max_drawdown,
+                "turnover": self.traded / mean_eq if mean_eq else 0.0}
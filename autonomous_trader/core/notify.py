@@ -0,0 +1,101 @@
+import asyncio, json, logging, os
+from typing import Any, Dict, List, Optional
+from .types import Event, TOPIC_ALERT
+
+# Notification sinks. A sink takes a batch of events per send(); NotifyAgent gives each sink
+# its own bounded queue and task, so a slow or failing channel drops its own oldest batches
+# and never delays the others or the bus.
+
+_TAGS = {TOPIC_ALERT: "ALERT"}
+
+
+def format_event(ev: Event) -> str:
+    return f"[{_TAGS.get(ev.topic, ev.topic.upper())}] {ev.payload}"
+
+
+def event_record(ev: Event) -> Dict[str, Any]:
+    return {"ts": ev.ts, "topic": ev.topic, **{k: v for k, v in ev.payload.items()
+                                               if isinstance(v, (str, int, float, bool, type(None)))}}
+
+
+class LoggerSink:
+    # the "trader" logger, as NotifyAgent always logged: alerts at WARNING, the rest at INFO;
+    # records carry topic/event extras for JSON-lines output and per-topic sampling
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self.log = logger or logging.getLogger("trader")
+
+    async def send(self, batch: List[Event]):
+        for ev in batch:
+            self.log.log(logging.WARNING if ev.topic == TOPIC_ALERT else logging.INFO, format_event(ev),
+                         extra={"topic": ev.topic, "event": event_record(ev)})
+
+    async def close(self):
+        pass
+
+
+class FileSink:
+    # JSON lines appended off the event loop
+    def __init__(self, path: str):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self._f = open(path, "a", buffering=1 << 16)
+
+    def _write(self, lines: str):
+        self._f.write(lines)
+        self._f.flush()
+
+    async def send(self, batch: List[Event]):
+        lines = "".join(json.dumps(event_record(ev), default=str) + "\n" for ev in batch)
+        await asyncio.to_thread(self._write, lines)
+
+    async def close(self):
+        self._f.close()
+
+
+class WebhookSink:
+    # one JSON POST per batch ({"text": ..., "events": [...]}, Slack/Discord-style); aiohttp is
+    # imported on first use
+    def __init__(self, url: str, timeout: float = 5.0, headers: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = headers or {}
+        self._session = None
+
+    async def send(self, batch: List[Event]):
+        if self._session is None:
+            import aiohttp
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        body = {"text": "\n".join(format_event(ev) for ev in batch),
+                "events": [event_record(ev) for ev in batch]}
+        async with self._session.post(self.url, json=body, headers=self.headers) as resp:
+            resp.raise_for_status()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+class MemorySink:
+    # local stub: keeps the batches, optionally taking `delay` seconds per send like a slow channel
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batches: List[List[Event]] = []
+
+    async def send(self, batch: List[Event]):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.batches.append(batch)
+
+    async def close(self):
+        pass
+
+
+SINKS = {"log": LoggerSink, "file": FileSink, "webhook": WebhookSink, "memory": MemorySink}
+
+
+def make_sink(spec: Dict[str, Any]):
+    # {"type": "webhook", "url": ...} / {"type": "file", "path": ...} / {"type": "log"}
+    kw = dict(spec)
+    return SINKS[kw.pop("type")](**kw)
@@ -0,0 +1,159 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+from .stream import ReplayFeed
+
+# Local L2 order books. A book takes a snapshot, then diffs ([price, size] rows, size 0 removes
+# the level). Best prices are O(1); sweep/impact walk only the levels an order would consume.
+# Feeds deliver frames (symbol, "book" | "book_diff", {"bids", "asks", "nonce", "ts"}), so
+# recordings replay through stream.ReplayFeed like trade and kline frames.
+
+
+class OrderBook:
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.nonce: Optional[int] = None
+        self.ts: Optional[int] = None
+        self._bids: Dict[float, float] = {}
+        self._asks: Dict[float, float] = {}
+        self._bid_keys: List[float] = []  # negated prices, ascending: best bid first
+        self._ask_keys: List[float] = []  # prices, ascending: best ask first
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._bids) and bool(self._asks)
+
+    def snapshot(self, bids: Iterable, asks: Iterable, nonce: int = None, ts: int = None):
+        self._bids = {float(r[0]): float(r[1]) for r in bids if float(r[1]) > 0}
+        self._asks = {float(r[0]): float(r[1]) for r in asks if float(r[1]) > 0}
+        self._bid_keys = sorted(-p for p in self._bids)
+        self._ask_keys = sorted(self._asks)
+        self.nonce, self.ts = nonce, ts
+
+    @staticmethod
+    def _set(levels: Dict[float, float], keys: List[float], price: float, size: float, key: float):
+        if size <= 0:
+            if levels.pop(price, None) is not None:
+                del keys[bisect_left(keys, key)]
+        else:
+            if price not in levels:
+                insort(keys, key)
+            levels[price] = size
+
+    def update(self, bids: Iterable, asks: Iterable, nonce: int = None, ts: int = None) -> bool:
+        # False (and nothing applied) for a diff at or before the current nonce
+        if nonce is not None and self.nonce is not None and nonce <= self.nonce:
+            return False
+        for r in bids:
+            p = float(r[0])
+            self._set(self._bids, self._bid_keys, p, float(r[1]), -p)
+        for r in asks:
+            p = float(r[0])
+            self._set(self._asks, self._ask_keys, p, float(r[1]), p)
+        if nonce is not None:
+            self.nonce = nonce
+        self.ts = ts if ts is not None else self.ts
+        return True
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return -self._bid_keys[0] if self._bid_keys else None
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return self._ask_keys[0] if self._ask_keys else None
+
+    def mid(self) -> Optional[float]:
+        if not self.ready:
+            return None
+        return (self.best_bid + self.best_ask) / 2.0
+
+    def spread_bps(self) -> Optional[float]:
+        m = self.mid()
+        return (self.best_ask - self.best_bid) / m * 1e4 if m else None
+
+    def levels(self, side: str, n: int = 10) -> List[Tuple[float, float]]:
+        # the n levels a market order on `side` would consume, best first
+        if side == "buy":
+            return [(p, self._asks[p]) for p in self._ask_keys[:n]]
+        return [(-k, self._bids[-k]) for k in self._bid_keys[:n]]
+
+    def sweep(self, side: str, amount: float = None, notional: float = None) -> Optional[Tuple[float, float]]:
+        # (average price, amount) of a market order for `amount` base or `notional` quote;
+        # None if the visible book is too thin to fill it, or the order is empty
+        if (amount is not None and amount <= 0) or (notional is not None and notional <= 0):
+            return None
+        if side == "buy":
+            levels, keys, sign = self._asks, self._ask_keys, 1.0
+        else:
+            levels, keys, sign = self._bids, self._bid_keys, -1.0
+        left_q = amount if amount is not None else float("inf")
+        left_n = notional if notional is not None else float("inf")
+        got_q = got_n = 0.0
+        for k in keys:
+            px = sign * k
+            q = min(levels[px], left_q, left_n / px)
+            got_q += q
+            got_n += q * px
+            left_q -= q
+            left_n -= q * px
+            if left_q <= 1e-12 or left_n <= 1e-9:
+                return (got_n / got_q, got_q) if got_q > 0 else None
+        return None
+
+    def impact_bps(self, side: str, notional: float) -> Optional[float]:
+        # slippage of a market order beyond the touch price, in bps; None if too thin
+        touch = self.best_ask if side == "buy" else self.best_bid
+        res = self.sweep(side, notional=notional) if touch else None
+        if res is None:
+            return None
+        return abs(res[0] - touch) / touch * 1e4
+
+
+class OrderBooks:
+    # the books of one exchange, maintained from a feed's "book" / "book_diff" frames
+    def __init__(self):
+        self.books: Dict[str, OrderBook] = {}
+        self.gaps = 0
+
+    def get(self, symbol: str) -> Optional[OrderBook]:
+        book = self.books.get(symbol)
+        return book if book is not None and book.ready else None
+
+    def on_frame(self, symbol: str, kind: str, data: dict):
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(symbol)
+        if kind == "book":
+            book.snapshot(data["bids"], data["asks"], data.get("nonce"), data.get("ts"))
+        elif kind == "book_diff":
+            if not book.update(data["bids"], data["asks"], data.get("nonce"), data.get("ts")):
+                self.gaps += 1
+
+    async def run(self, feed, symbols: Iterable[str]):
+        async for sym, kind, data in feed.stream(symbols, None):
+            self.on_frame(sym, kind, data)
+
+
+def book_for(books, exchange: Optional[str], symbol: str) -> Optional[OrderBook]:
+    # `books` is one OrderBooks or {exchange name: OrderBooks}, as agents take exchange clients;
+    # only an unrouted (exchange=None) order may use another venue's book
+    if books is None:
+        return None
+    if isinstance(books, dict):
+        books = books.get(exchange) if exchange is not None else next(iter(books.values()), None)
+        if books is None:
+            return None
+    return books.get(symbol)
+
+
+def book_frame(symbol: str, bids, asks, nonce: int = None, diff: bool = False, t: float = None) -> dict:
+    # a replayable frame dict for ReplayFeed, e.g. to drive OrderBooks in tests
+    return {"t": t, "symbol": symbol, "kind": "book_diff" if diff else "book",
+            "data": {"bids": [list(r) for r in bids], "asks": [list(r) for r in asks], "nonce": nonce}}
+
+
+async def replay_books(frames, symbols: Iterable[str]) -> OrderBooks:
+    # local stub: build books from recorded or synthetic frames without a connection
+    books = OrderBooks()
+    await books.run(ReplayFeed(frames), symbols)
+    return books
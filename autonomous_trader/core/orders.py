@@ -0,0 +1,205 @@
+import asyncio, time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from .types import Event, FillEvent, IntentEvent, OrderEvent, ORDER_DONE, TOPIC_ALERT
+from .tracing import child
+from .utils import maybe_await
+
+# Order lifecycle for one exchange. Submissions are tagged with the intent's client_id, so a
+# retry after a timeout either lands once or is rejected as a duplicate. Status comes from one
+# fetch_orders() per symbol with open orders (never one request per order), polled on an interval
+# that shortens while orders are moving and backs off while they are not, or from a user-data
+# stream via watch(). Fill progress is published as FillEvents carrying only the new amount.
+
+
+@dataclass
+class TrackedOrder:
+    client_id: str
+    symbol: str
+    side: str
+    amount: float
+    exchange: Optional[str] = None
+    id: Optional[str] = None
+    status: str = "pending"  # until create_order returns (or gives up retrying)
+    filled: float = 0.0
+    cost: float = 0.0
+    submitted: float = field(default_factory=time.time)
+    misses: int = 0  # polls that did not return this order
+    trace: Any = None
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.amount - self.filled)
+
+
+class OrderManager:
+    def __init__(self, bus, exchange, name: Optional[str] = None, min_interval: float = 0.25,
+                 max_interval: float = 5.0, max_retries: int = 3, max_misses: int = 5,
+                 remember: int = 10000):
+        self.bus = bus
+        self.exchange = exchange
+        self.name = name
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_retries = max_retries
+        self.max_misses = max_misses  # polls before an unacknowledged order is given up on
+        self.orders: Dict[str, TrackedOrder] = {}  # client_id -> open order
+        self.finished: "OrderedDict[str, str]" = OrderedDict()  # recent client_id -> final status
+        self.remember = remember
+        self.streaming = False
+        self.polls = 0
+        self._interval = min_interval
+        self._wake = asyncio.Event()
+
+    async def _alert(self, severity: str, msg: str, **extra):
+        await self.bus.publish(Event(topic=TOPIC_ALERT, payload={"severity": severity, "msg": msg, **extra}))
+
+    async def submit(self, ev: IntentEvent) -> Optional[TrackedOrder]:
+        # idempotent on client_id: a repeated intent neither re-sends nor double-tracks
+        cid = ev.client_id
+        if cid in self.orders or cid in self.finished:
+            return self.orders.get(cid)
+        o = self.orders[cid] = TrackedOrder(cid, ev.symbol, ev.side, float(ev.amount), ev.exchange,
+                                            trace=child(ev.trace, "order"))
+        resp = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                resp = await maybe_await(self.exchange.create_market_order(o.symbol, o.side, o.amount,
+                                                                           client_id=cid))
+                break
+            except Exception as e:
+                import ccxt  # only to classify a failure; paper and replay runs never load it
+                if isinstance(e, ccxt.DuplicateOrderId):
+                    break  # an earlier attempt got through; the next poll picks it up by client_id
+                if isinstance(e, ccxt.NetworkError):
+                    # outcome unknown: resend under the same client_id
+                    if attempt == self.max_retries:
+                        await self._alert("warn", f"Order {cid} unconfirmed after {attempt + 1} tries: {e}",
+                                          symbol=o.symbol)
+                    else:
+                        await asyncio.sleep(min(2.0, 0.2 * 2 ** attempt))
+                    continue
+                self.orders.pop(cid, None)
+                await self._alert("error", f"Exec error: {e}", symbol=o.symbol)
+                return None
+        if cid not in self.orders:
+            return o  # a poll resolved it while retries were backing off
+        if o.status == "pending":
+            o.status = "submitted"
+            await self.bus.publish(OrderEvent(cid, "submitted", (resp or {}).get("id"), exchange=o.exchange,
+                                              trace=o.trace))
+        if resp:
+            await self._apply(o, resp)
+        self._interval = self.min_interval
+        self._wake.set()
+        return o
+
+    def adopt(self, ev: IntentEvent, id: Optional[str] = None, filled: float = 0.0, cost: float = 0.0):
+        # track an order recovered from the journal without resending it; an order the exchange
+        # never received is reported "lost" after max_misses polls
+        o = self.orders[ev.client_id] = TrackedOrder(ev.client_id, ev.symbol, ev.side, float(ev.amount),
+                                                     ev.exchange, id, "submitted", filled, cost,
+                                                     submitted=ev.ts, trace=ev.trace)
+        self._wake.set()
+        return o
+
+    async def _apply(self, o: TrackedOrder, r: Dict[str, Any]):
+        o.id = o.id or r.get("id")
+        o.misses = 0
+        filled = float(r.get("filled") or 0.0)
+        cost = r.get("cost")
+        cost = float(cost) if cost is not None else filled * float(r.get("average") or r.get("price") or 0.0)
+        moved = filled > o.filled + 1e-12
+        if moved:
+            amount, notional = filled - o.filled, cost - o.cost
+            o.filled, o.cost = filled, cost
+            price = notional / amount if amount > 0 and notional > 0 else float(r.get("average") or 0.0)
+            await self.bus.publish(FillEvent(o.client_id, o.symbol, o.side, amount, price, o.exchange,
+                                             trace=child(o.trace, "fill")))
+            if hasattr(self.exchange, "invalidate"):
+                self.exchange.invalidate(o.symbol)
+        status = r.get("status") or o.status
+        if status == "open" and 0 < o.filled < o.amount:
+            status = "partial"
+        if status != o.status:
+            o.status = status
+            await self.bus.publish(OrderEvent(o.client_id, status, o.id, exchange=o.exchange, trace=o.trace))
+        if status in ORDER_DONE:
+            self._finish(o, status)
+        return moved or status in ORDER_DONE
+
+    def _finish(self, o: TrackedOrder, status: str):
+        self.orders.pop(o.client_id, None)
+        self.finished[o.client_id] = status
+        while len(self.finished) > self.remember:
+            self.finished.popitem(last=False)
+
+    def _match(self, r: Dict[str, Any]) -> Optional[TrackedOrder]:
+        o = self.orders.get(r.get("clientOrderId"))
+        if o is None and r.get("id") is not None:
+            o = next((x for x in self.orders.values() if x.id == r["id"]), None)
+        return o
+
+    async def _poll_symbol(self, symbol: str, open_orders: List[TrackedOrder]) -> bool:
+        since = int(min(o.submitted for o in open_orders) * 1000) - 1000
+        rows = await maybe_await(self.exchange.fetch_orders(symbol, since))
+        changed, seen = False, set()
+        for r in rows or ():
+            o = self._match(r)
+            if o is not None and o.symbol == symbol:
+                seen.add(o.client_id)
+                changed |= await self._apply(o, r)
+        for o in open_orders:
+            if o.client_id not in seen and o.client_id in self.orders and o.status != "pending":
+                o.misses += 1
+                if o.id is None and o.misses >= self.max_misses:
+                    self._finish(o, "lost")
+                    await self.bus.publish(OrderEvent(o.client_id, "lost", exchange=o.exchange, trace=o.trace))
+                    await self._alert("error", f"Order {o.client_id} not found on exchange", symbol=symbol)
+        return changed
+
+    async def poll_once(self) -> bool:
+        by_symbol: Dict[str, List[TrackedOrder]] = {}
+        for o in list(self.orders.values()):
+            by_symbol.setdefault(o.symbol, []).append(o)
+        self.polls += 1
+        results = await asyncio.gather(*(self._poll_symbol(s, os_) for s, os_ in by_symbol.items()),
+                                       return_exceptions=True)
+        changed = False
+        for sym, res in zip(by_symbol, results):
+            if isinstance(res, BaseException):
+                await self._alert("warn", f"Order poll failed: {res}", symbol=sym)
+            else:
+                changed |= res
+        return changed
+
+    async def run(self):
+        while True:
+            if not self.orders:
+                self._wake.clear()
+                await self._wake.wait()
+                self._interval = self.min_interval
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if not self.orders:
+                continue
+            changed = await self.poll_once()
+            # while a user-data stream is live the poll is only a safety net
+            ceiling = self.max_interval * (4 if self.streaming else 1)
+            self._interval = self.min_interval if changed else min(ceiling, self._interval * 1.5)
+
+    async def watch(self, stream_exchange):
+        # user-data websocket (ccxt.pro watch_orders); updates apply as they arrive
+        self.streaming = True
+        try:
+            while True:
+                for r in await stream_exchange.watch_orders():
+                    o = self._match(r)
+                    if o is not None:
+                        await self._apply(o, r)
+        finally:
+            self.streaming = False
@@ -0,0 +1,159 @@
+import math
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+# Portfolio risk for one quote currency over NumPy arrays, one slot per symbol: quantities, last
+# prices, position caps and a ring of log prices sampled once per time bucket for correlations.
+# check() sizes one order against equity, its symbol cap, gross exposure, drawdown from peak and
+# its correlation with the rest of the book in a single vectorized pass.
+
+
+def quote_of(symbol: str) -> str:
+    # "BTC/USDT" and "BTC/USDT:USDT" -> "USDT"
+    return symbol.split("/")[1].split(":")[0] if "/" in symbol else "USDT"
+
+
+class PortfolioRisk:
+    def __init__(self, quote: str = "USDT", max_position_pct: float = 1.0,
+                 max_gross_pct: Optional[float] = None, max_drawdown_pct: Optional[float] = None,
+                 caps: Optional[Dict[str, float]] = None, corr_window: int = 100,
+                 corr_bucket_sec: float = 60.0, corr_penalty: float = 0.5, capacity: int = 64):
+        self.quote = quote
+        self.max_position_pct = float(max_position_pct)
+        self.max_gross_pct = math.inf if max_gross_pct is None else float(max_gross_pct)
+        self.max_drawdown_pct = max_drawdown_pct  # kill switch: reduce-only once equity falls this far from peak
+        self.cap_overrides = dict(caps or {})      # symbol -> max position as a fraction of equity
+        self.corr_bucket_sec = corr_bucket_sec
+        self.corr_penalty = corr_penalty  # size scale 1 - penalty * corr with the book, when adding risk
+        self.cash = 0.0
+        self.peak = 0.0
+        self.halted = False
+        self.index: Dict[str, int] = {}  # symbol -> slot
+        self._base: Dict[str, int] = {}  # base asset -> slot, for ccxt balances
+        self.qty = np.zeros(capacity)
+        self.px = np.zeros(capacity)     # 0: no price yet, the position is not valued
+        self.caps = np.zeros(capacity)
+        self._hist = np.full((corr_window, capacity), np.nan)  # log prices, one row per bucket
+        self._rows = 0
+        self._bucket = -math.inf
+        self._returns = None  # (rows, symbols, matrix): bucket returns, rebuilt once per new bucket
+
+    @classmethod
+    def from_config(cls, risk_cfg: Dict, quote: str = "USDT") -> "PortfolioRisk":
+        return cls(quote, float(risk_cfg.get("max_position_pct", 1.0)), risk_cfg.get("max_gross_pct"),
+                   risk_cfg.get("max_drawdown_pct"), risk_cfg.get("position_caps"),
+                   int(risk_cfg.get("corr_window", 100)), float(risk_cfg.get("corr_bucket_sec", 60.0)),
+                   float(risk_cfg.get("corr_penalty", 0.5)))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def slot(self, symbol: str) -> int:
+        i = self.index.get(symbol)
+        if i is not None:
+            return i
+        i = self.index[symbol] = len(self.index)
+        if i == len(self.qty):
+            pad = len(self.qty)
+            self.qty = np.concatenate([self.qty, np.zeros(pad)])
+            self.px = np.concatenate([self.px, np.zeros(pad)])
+            self.caps = np.concatenate([self.caps, np.zeros(pad)])
+            self._hist = np.hstack([self._hist, np.full((len(self._hist), pad), np.nan)])
+        self.caps[i] = float(self.cap_overrides.get(symbol, self.max_position_pct))
+        self._base.setdefault(symbol.split("/")[0], i)
+        return i
+
+    def mark(self, symbol: str, px: float, ts: Optional[float] = None):
+        # last price; with a timestamp (epoch seconds, market time) a new bucket first records the
+        # prices as of the end of the previous one
+        i = self.slot(symbol)
+        if ts is not None and ts >= self._bucket:
+            if self._rows:
+                n = len(self.index)
+                p = self.px[:n]
+                self._hist[(self._rows - 1) % len(self._hist), :n] = np.log(np.where(p > 0, p, np.nan))
+            self._rows += 1
+            self._bucket = (ts // self.corr_bucket_sec + 1) * self.corr_bucket_sec
+        self.px[i] = px
+
+    def sync(self, bal: Dict):
+        # cash and positions from a ccxt-shaped balance; assets without a symbol here are not valued
+        total = bal.get("total", {})
+        self.cash = float(total.get(self.quote, 0) or 0)
+        self.qty[:] = 0.0
+        for asset, q in total.items():
+            i = self._base.get(asset)
+            if i is not None and asset != self.quote:
+                self.qty[i] = float(q or 0)
+
+    def equity(self) -> float:
+        n = len(self.index)
+        return self.cash + float(self.qty[:n] @ self.px[:n])
+
+    def exposure(self) -> Tuple[float, float]:
+        # (gross, net) notional
+        n = len(self.index)
+        notional = self.qty[:n] * self.px[:n]
+        return float(np.abs(notional).sum()), float(notional.sum())
+
+    def correlation(self, symbol: str) -> float:
+        # correlation of the symbol's bucket returns with those of the rest of the book
+        i = self.index.get(symbol)
+        rows = min(self._rows - 1, len(self._hist))
+        if i is None or rows < 3:
+            return 0.0
+        n = len(self.index)
+        if self._returns is None or self._returns[:2] != (self._rows, n):
+            order = (np.arange(rows) + (self._rows - 1 - rows)) % len(self._hist)
+            self._returns = (self._rows, n, np.nan_to_num(np.diff(self._hist[order, :n], axis=0)))
+        r = self._returns[2]
+        w = self.qty[:n] * self.px[:n]
+        w[i] = 0.0
+        book = r @ w
+        x = r[:, i]
+        sx, sb = x.std(), book.std()
+        if sx == 0 or sb == 0:
+            return 0.0
+        return float(((x - x.mean()) * (book - book.mean())).mean() / (sx * sb))
+
+    def reset(self):
+        # re-arm after a kill switch; the peak restarts from current equity
+        self.halted = False
+        self.peak = self.equity()
+
+    def check(self, symbol: str, side: str, amount: float, px: float) -> Tuple[float, str]:
+        # (allowed amount, reason); call mark() and sync() first
+        i = self.slot(symbol)
+        n = len(self.index)
+        notional = self.qty[:n] * self.px[:n]
+        eq = self.cash + float(notional.sum())
+        self.peak = max(self.peak, eq)
+        sign = 1.0 if side == "buy" else -1.0
+        pos = float(notional[i])
+        reduces = sign * pos < 0
+        if (self.max_drawdown_pct is not None and self.peak > 0
+                and eq <= self.peak * (1.0 - float(self.max_drawdown_pct))):
+            self.halted = True
+        if self.halted:
+            if not reduces:
+                return 0.0, "drawdown kill switch"
+            return min(amount, abs(pos) / px), "reduce only"
+
+        want = amount * px
+        reason = "ok"
+        if not reduces and self.corr_penalty:
+            rho = sign * self.correlation(symbol)  # > 0: moves with the book's P&L
+            if rho > 0:
+                want *= 1.0 - self.corr_penalty * rho
+                reason = "correlation"
+        sym_room = float(self.caps[i]) * eq - sign * pos
+        if sym_room < want:
+            want, reason = sym_room, "symbol cap"
+        if self.max_gross_pct < math.inf:
+            gross_room = self.max_gross_pct * eq - float(np.abs(notional).sum())
+            if reduces:
+                # the part of the order that only closes the position always fits
+                gross_room = max(abs(pos), gross_room + 2 * abs(pos))
+            if gross_room < want:
+                want, reason = gross_room, "gross cap"
+        return max(0.0, want) / px, reason
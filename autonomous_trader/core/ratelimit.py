@@ -0,0 +1,88 @@
+import asyncio, functools, time
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+class TokenBucket:
+    # async token bucket: `rate` tokens per second, bursts up to `capacity`. Waiters are served
+    # in arrival order, so one heavy request cannot be starved by a stream of light ones.
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.waited_sec = 0.0
+        self._t = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._t) * self.rate)
+        self._t = now
+
+    async def acquire(self, weight: float = 1.0):
+        if weight > self.capacity:
+            # the bucket never holds that many tokens, so the wait would never end
+            raise ValueError(f"weight {weight} exceeds bucket capacity {self.capacity}")
+        async with self._lock:
+            self._refill()
+            while self.tokens < weight:
+                wait = (weight - self.tokens) / self.rate
+                self.waited_sec += wait
+                await asyncio.sleep(wait)
+                self._refill()
+            self.tokens -= weight
+
+class Coalescer:
+    # concurrent calls with the same key share one in-flight future instead of each hitting the API
+    def __init__(self):
+        self._inflight: Dict[Any, asyncio.Future] = {}
+        self.shared = 0
+
+    def _done(self, key, fut):
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+
+    def forget(self, key=None):
+        # later callers start a fresh request instead of joining one issued before a state change
+        if key is None:
+            self._inflight.clear()
+        else:
+            self._inflight.pop(key, None)
+
+    async def run(self, key, fn: Callable[[], Awaitable]):
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.shared += 1
+        else:
+            fut = self._inflight[key] = asyncio.ensure_future(fn())
+            fut.add_done_callback(functools.partial(self._done, key))
+        # shielded: one caller being cancelled must not cancel the request for the others
+        return await asyncio.shield(fut)
+
+class TTLCache:
+    # short-lived response cache. invalidate() bumps a generation so a response requested before
+    # the invalidation is not stored after it.
+    def __init__(self, ttl: float = 1.0):
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._d: Dict[Any, Tuple[float, Any]] = {}
+
+    def get(self, key, default=None):
+        hit = self._d.get(key)
+        if hit is not None and time.monotonic() - hit[0] < self.ttl:
+            self.hits += 1
+            return hit[1]
+        self.misses += 1
+        return default
+
+    def put(self, key, value, generation: int = None):
+        if generation is None or generation == self.generation:
+            self._d[key] = (time.monotonic(), value)
+
+    def invalidate(self, match: Callable[[Any], bool] = None):
+        self.generation += 1
+        if match is None:
+            self._d.clear()
+        else:
+            for k in [k for k in self._d if match(k)]:
+                del self._d[k]
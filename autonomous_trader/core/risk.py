@@ -0,0 +1,21 @@
+from typing import Any, Dict, Tuple
+
+def micro_cap_gate(p0: Dict[str, Any], meta: Dict[str, Any], notional: float, equity: float,
+                   edge_bps: float, slippage_bps: float = 5.0, spread_bps: float = 10.0) -> Tuple[bool, str]:
+    # phase0 micro-cap checks shared by RiskAgent and the batch backtester
+    if not p0.get("enabled", False):
+        return True, "disabled"
+
+    min_notional = (meta.get("min_notional") or 0.0) * float(p0.get("min_notional_buffer", 1.0))
+    taker_bps = float(meta.get("taker", 0.001)) * 1e4
+    safety_bps = float(p0.get("safety_bps", 3))
+
+    if notional < min_notional:
+        return False, f"below min_notional {min_notional}"
+    if equity < float(p0.get("min_live_balance_usd", 25)):
+        return False, "low equity"
+    if notional > float(p0.get("max_trade_usd", 1)):
+        return False, "max_trade_usd"
+    if edge_bps <= (taker_bps + spread_bps + slippage_bps + safety_bps):
+        return False, "edge<costs"
+    return True, "ok"
@@ -1,5 +1,5 @@
-import sqlite3, threading, time
-from typing import Any, Dict, Tuple
+import logging, queue, sqlite3, threading, time
+from typing import Dict, Tuple
 
 _SQL_SCHEMA = """
 CREATE TABLE IF NOT EXISTS positions (
@@ -22,38 +22,158 @@ CREATE TABLE IF NOT EXISTS meta (
 );
 """
 
+_STOP = object()
+
 class Store:
-    def __init__(self, path: str):
+    # With write_behind=True every write is queued and a dedicated writer thread group-commits
+    # up to batch_size statements per transaction (or whatever arrived within flush_interval).
+    # A file store with write-behind commits with synchronous=NORMAL (a WAL commit is not fsynced);
+    # flush() is its durability barrier: it waits for everything queued before it to commit, then
+    # checkpoints the WAL into the fsynced database file. Without write-behind each commit is synced.
+    # Meta is cached write-through; other reads wait for the queue first, so callers always see
+    # their own writes.
+    def __init__(self, path: str, write_behind: bool = False, batch_size: int = 256,
+                 flush_interval: float = 0.05):
         self._lock = threading.Lock()
         self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lazy_sync = write_behind and path != ":memory:"
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        if self._lazy_sync:
+            self._conn.execute("PRAGMA synchronous=NORMAL")
         with self._conn:
             self._conn.executescript(_SQL_SCHEMA)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._meta: Dict[str, str] = {}
+        self._queue = None
+        self._writer = None
+        if write_behind:
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(target=self._write_loop, name="store-writer", daemon=True)
+            self._writer.start()
 
-    def set_meta(self, k: str, v: str):
+    def _write(self, sql: str, params: Tuple):
+        if self._queue is not None:
+            self._queue.put((sql, params))
+            return
         with self._lock, self._conn:
-            self._conn.execute("REPLACE INTO meta(k,v) VALUES(?,?)", (k, v))
+            self._conn.execute(sql, params)
+
+    def _write_many(self, sql: str, rows):
+        # one transaction for the lot (or one queued statement per row with write-behind)
+        if self._queue is not None:
+            for params in rows:
+                self._queue.put((sql, params))
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(sql, rows)
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not isinstance(batch[-1], threading.Event) \
+                and batch[-1] is not _STOP:
+            try:
+                batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit(self, stmts):
+        try:
+            with self._lock, self._conn:
+                for sql, params in stmts:
+                    self._conn.execute(sql, params)
+        except sqlite3.Error:
+            # isolate the bad statement so the rest of the batch still lands
+            for sql, params in stmts:
+                try:
+                    with self._lock, self._conn:
+                        self._conn.execute(sql, params)
+                except sqlite3.Error:
+                    logging.getLogger("trader").exception(f"Store write failed: {sql}")
+
+    def _write_loop(self):
+        while True:
+            batch = self._next_batch()
+            stmts = [b for b in batch if isinstance(b, tuple)]
+            if stmts:
+                self._commit(stmts)
+            for b in batch:
+                if isinstance(b, threading.Event):
+                    b.set()
+            if batch[-1] is _STOP:
+                return
+
+    def _drain(self, timeout: float = None) -> bool:
+        # waits until everything queued so far is committed (reads need no fsync)
+        if self._queue is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def flush(self, timeout: float = None) -> bool:
+        if not self._drain(timeout):
+            return False
+        if self._lazy_sync:
+            with self._lock:
+                self._conn.execute("PRAGMA wal_checkpoint(FULL)")
+        return True
+
+    def close(self):
+        if self._queue is not None and self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        self._conn.close()
+
+    def set_meta(self, k: str, v: str):
+        self._meta[k] = v
+        self._write("REPLACE INTO meta(k,v) VALUES(?,?)", (k, v))
 
     def get_meta(self, k: str, default: str = "") -> str:
-        cur = self._conn.execute("SELECT v FROM meta WHERE k=?", (k,))
-        row = cur.fetchone()
+        if k in self._meta:
+            return self._meta[k]
+        self._drain()
+        with self._lock:
+            row = self._conn.execute("SELECT v FROM meta WHERE k=?", (k,)).fetchone()
+        if row:
+            self._meta[k] = row[0]
         return row[0] if row else default
 
     def upsert_position(self, symbol: str, qty: float, avg_price: float):
-        with self._lock, self._conn:
-            self._conn.execute("REPLACE INTO positions(symbol,qty,avg_price) VALUES(?,?,?)",
-                              (symbol, qty, avg_price))
+        self._write("REPLACE INTO positions(symbol,qty,avg_price) VALUES(?,?,?)",
+                    (symbol, qty, avg_price))
 
     def add_trade(self, id: str, ts: float, symbol: str, side: str, qty: float,
                   price: float, fees: float, mode: str):
-        with self._lock, self._conn:
-            self._conn.execute(
-                "INSERT OR REPLACE INTO trades(id,ts,symbol,side,qty,price,fees,mode) VALUES(?,?,?,?,?,?,?,?)",
-                (id, ts, symbol, side, qty, price, fees, mode))
+        self._write(
+            "INSERT OR REPLACE INTO trades(id,ts,symbol,side,qty,price,fees,mode) VALUES(?,?,?,?,?,?,?,?)",
+            (id, ts, symbol, side, qty, price, fees, mode))
 
     def add_equity(self, ts: float, equity: float):
-        with self._lock, self._conn:
-            self._conn.execute("INSERT INTO equity(ts,equity) VALUES(?,?)", (ts, equity))
+        self._write("INSERT INTO equity(ts,equity) VALUES(?,?)", (ts, equity))
+
+    def add_equity_many(self, rows):
+        # (ts, equity) rows
+        self._write_many("INSERT INTO equity(ts,equity) VALUES(?,?)", rows)
+
+    def get_trades(self, mode: str = None):
+        # (ts, symbol, side, qty, price, fees) in time order, as core.metrics reads them
+        self._drain()
+        sql = "SELECT ts, symbol, side, qty, price, fees FROM trades"
+        with self._lock:
+            if mode is None:
+                return self._conn.execute(sql + " ORDER BY ts").fetchall()
+            return self._conn.execute(sql + " WHERE mode=? ORDER BY ts", (mode,)).fetchall()
+
+    def get_equity(self):
+        self._drain()
+        with self._lock:
+            return self._conn.execute("SELECT ts, equity FROM equity ORDER BY ts").fetchall()
 
     def get_positions(self):
-        cur = self._conn.execute("SELECT symbol, qty, avg_price FROM positions")
-        return cur.fetchall()
\ No newline at end of file
+        self._drain()
+        with self._lock:
+            return self._conn.execute("SELECT symbol, qty, avg_price FROM positions").fetchall()
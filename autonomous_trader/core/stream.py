@@ -0,0 +1,102 @@
+import asyncio, json, time
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from .utils import timeframe_ms
+
+# Streaming market data. A feed yields frames (symbol, kind, data) where kind is "trades"
+# (data = [[ts_ms, price, amount], ...]), "ohlcv" (data = exchange kline rows) or "book"
+# (data = {"bids", "asks", "nonce", "ts"}, see orderbook.OrderBooks). Frames can be
+# recorded as JSON lines and replayed through ReplayFeed for tests and offline runs.
+
+Frame = Tuple[str, str, list]
+
+
+class BarAggregator:
+    # builds OHLCV bars for one symbol from a trade stream
+    def __init__(self, timeframe: str):
+        self.step = timeframe_ms(timeframe)
+        self.bar: Optional[list] = None  # forming bar [ts, open, high, low, close, volume]
+
+    def add(self, ts: int, price: float, amount: float) -> List[list]:
+        # returns the bars closed by this trade; trades for already-closed bars are ignored
+        start = int(ts) - int(ts) % self.step
+        closed = []
+        b = self.bar
+        if b is None or start > b[0]:
+            if b is not None:
+                closed.append(b)
+            self.bar = [start, price, price, price, price, amount]
+        elif start == b[0]:
+            b[2] = max(b[2], price)
+            b[3] = min(b[3], price)
+            b[4] = price
+            b[5] += amount
+        return closed
+
+
+class CcxtProFeed:
+    # exchange websocket feed via ccxt.pro (watch_trades / watch_ohlcv / watch_order_book),
+    # optionally recording frames. ccxt.pro applies the exchange's diffs itself, so "book" frames
+    # are snapshots of the top `depth` levels.
+    def __init__(self, name: str, kind: str = "trades", record: Optional[str] = None, depth: int = 50):
+        import ccxt.pro as ccxtpro
+        self.ex = getattr(ccxtpro, name)()
+        self.kind = kind
+        self.record = record
+        self.depth = depth
+
+    async def _watch(self, symbol: str, timeframe: str, out: asyncio.Queue):
+        while True:
+            if self.kind == "trades":
+                trades = await self.ex.watch_trades(symbol)
+                data = [[t["timestamp"], float(t["price"]), float(t["amount"])] for t in trades]
+            elif self.kind == "book":
+                ob = await self.ex.watch_order_book(symbol, self.depth)
+                data = {"bids": [r[:2] for r in ob["bids"][:self.depth]],
+                        "asks": [r[:2] for r in ob["asks"][:self.depth]],
+                        "nonce": ob.get("nonce"), "ts": ob.get("timestamp")}
+            else:
+                data = await self.ex.watch_ohlcv(symbol, timeframe)
+            await out.put((symbol, self.kind, data))
+
+    async def stream(self, symbols: Iterable[str], timeframe: str) -> AsyncIterator[Frame]:
+        out: asyncio.Queue = asyncio.Queue()
+        tasks = [asyncio.create_task(self._watch(s, timeframe, out)) for s in symbols]
+        sink = open(self.record, "a") if self.record else None
+        try:
+            while True:
+                frame = await out.get()
+                if sink is not None:
+                    sink.write(json.dumps({"t": time.time(), "symbol": frame[0], "kind": frame[1],
+                                           "data": frame[2]}) + "\n")
+                yield frame
+        finally:
+            for t in tasks:
+                t.cancel()
+            if sink is not None:
+                sink.close()
+            await self.ex.close()
+
+
+class ReplayFeed:
+    # replays recorded frames; speed=None replays as fast as possible, otherwise scales recorded gaps
+    def __init__(self, frames, speed: Optional[float] = None):
+        self.frames = frames  # path of a JSON-lines recording, or an iterable of frame dicts
+        self.speed = speed
+
+    def _load(self) -> Iterable[Dict]:
+        if isinstance(self.frames, str):
+            with open(self.frames) as f:
+                return [json.loads(line) for line in f if line.strip()]
+        return self.frames
+
+    async def stream(self, symbols: Iterable[str], timeframe: str) -> AsyncIterator[Frame]:
+        wanted = set(symbols)
+        prev_t = None
+        for fr in self._load():
+            if fr["symbol"] not in wanted:
+                continue
+            if self.speed and prev_t is not None and fr.get("t") is not None:
+                await asyncio.sleep(max(0.0, (fr["t"] - prev_t) / self.speed))
+            prev_t = fr.get("t", prev_t)
+            yield fr["symbol"], fr["kind"], fr["data"]
+            await asyncio.sleep(0)
@@ -0,0 +1,89 @@
+import itertools, os, tempfile, time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+from .backtest import vectorized_backtest
+from .bars import BAR_COLUMNS
+from .metrics import max_drawdown
+from ..strategies.registry import create
+
+# Parameter sweeps over the batch backtester. OHLCV is written once to a .npy file and every
+# worker maps it read-only, so no worker refetches through ExchangeClient.fetch_ohlcv.
+
+_mapped: Dict[str, np.ndarray] = {}  # per-process cache of mapped datasets
+_BACKTEST_PARAMS = ("risk_per_trade_pct", "spread_bps", "start")  # other grid keys go to the strategy
+
+
+def param_grid(grid: Dict[str, Iterable[Any]]) -> List[Dict[str, Any]]:
+    keys = list(grid)
+    combos = [dict(zip(keys, vals)) for vals in itertools.product(*(list(grid[k]) for k in keys))]
+    return [c for c in combos if c.get("fast", 0) < c.get("slow", float("inf"))]
+
+
+def share_ohlcv(ohlcv, path: Optional[str] = None) -> str:
+    # rows of ts,open,high,low,close,volume -> float64 (n, 6) array on disk
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=".npy", prefix="ohlcv-")
+        os.close(fd)
+    np.save(path, np.asarray(ohlcv, dtype="float64"))
+    return path
+
+
+def _mapped_ohlcv(path: str) -> np.ndarray:
+    arr = _mapped.get(path)
+    if arr is None:
+        arr = _mapped[path] = np.load(path, mmap_mode="r")
+    return arr
+
+
+def _split_params(params: Dict[str, Any], phase0: Optional[Dict[str, Any]]):
+    # "phase0.<key>" entries override the base phase0 gate config
+    kw, p0 = {}, dict(phase0 or {})
+    for k, v in params.items():
+        if k.startswith("phase0."):
+            p0[k.split(".", 1)[1]] = v
+        else:
+            kw[k] = v
+    return kw, (p0 or None)
+
+
+def _run_one(task) -> Dict[str, Any]:
+    path, symbol, params, base = task
+    t0 = time.perf_counter()
+    arr = _mapped_ohlcv(path)
+    kw, p0 = _split_params(params, base.get("phase0"))
+    strategy = create(base.get("strategy", "sma_cross"),
+                      **{k: kw.pop(k) for k in list(kw) if k not in _BACKTEST_PARAMS})
+    res = vectorized_backtest(symbol, arr[:, 0].astype("int64"), arr[:, 4],
+                              cash=base.get("cash", 0.0), slippage_bps=base.get("slippage_bps", 5.0),
+                              meta=base.get("meta"), phase0=p0, strategy=strategy, risk=base.get("risk"),
+                              bars={c: arr[:, i] for i, c in enumerate(BAR_COLUMNS)}, **kw)
+    row = dict(params)
+    row.update({"pnl": res.pnl, "max_drawdown": max_drawdown(res.equity),
+                "trades": res.n_trades, "final_equity": float(res.equity[-1]) if len(res.equity) else 0.0,
+                "runtime_sec": time.perf_counter() - t0})
+    return row
+
+
+def run_sweep(ohlcv, symbol: str, grid: Dict[str, Iterable[Any]], cash: float = 0.0,
+              phase0: Optional[Dict[str, Any]] = None, meta: Optional[Dict[str, Any]] = None,
+              slippage_bps: float = 5.0, workers: Optional[int] = None,
+              strategy: str = "sma_cross", risk: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    # ohlcv may be raw rows or the path of an array written by share_ohlcv; `strategy` is a
+    # registry name or "module:Class", built per grid point from its strategy parameters; `risk` is
+    # RiskAgent's cfg["risk"] for the portfolio caps
+    owned = not isinstance(ohlcv, str)
+    path = share_ohlcv(ohlcv) if owned else ohlcv
+    base = {"cash": cash, "phase0": phase0, "meta": meta, "slippage_bps": slippage_bps, "strategy": strategy,
+            "risk": risk}
+    tasks = [(path, symbol, p, base) for p in param_grid(grid)]
+    try:
+        workers = workers or os.cpu_count() or 1
+        chunk = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(_run_one, tasks, chunksize=chunk))
+    finally:
+        if owned:
+            os.unlink(path)
+    return pd.DataFrame(rows).sort_values("pnl", ascending=False, ignore_index=True)
@@ -0,0 +1,112 @@
+import itertools, os, time
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+# Tick-to-trade tracing. A Trace starts when a bar enters the pipeline and every agent that
+# derives a new event from it appends a (stage, monotonic ns) hop, so the correlation id and
+# hop timestamps ride along bar -> features -> signal -> intent -> order -> fill.
+
+_ids = itertools.count(1)
+_PID = os.getpid() << 32
+
+
+class Trace:
+    __slots__ = ("id", "hops")
+
+    def __init__(self, id: int, hops: Tuple[Tuple[str, int], ...]):
+        self.id = id
+        self.hops = hops
+
+    @classmethod
+    def start(cls, stage: str) -> "Trace":
+        return cls(_PID | next(_ids), ((stage, time.monotonic_ns()),))
+
+    def child(self, stage: str) -> "Trace":
+        # hops are shared immutably, so fan-out subscribers never see each other's stamps
+        return Trace(self.id, self.hops + ((stage, time.monotonic_ns()),))
+
+    def __getstate__(self):
+        return self.id, self.hops
+
+    def __setstate__(self, state):
+        self.id, self.hops = state
+
+    def __repr__(self) -> str:
+        return f"Trace({self.id:x}, {[s for s, _ in self.hops]})"
+
+
+def child(trace: Optional[Trace], stage: str) -> Optional[Trace]:
+    return trace.child(stage) if trace is not None else None
+
+
+# log-spaced bucket bounds from 10us to ~10s, in seconds
+BUCKETS = tuple(float(f"{m}e{e}") for e in range(-5, 1) for m in (1, 2.5, 5)) + (10.0,)
+
+
+class LatencyHistogram:
+    # cumulative buckets for Prometheus plus a ring of recent samples for exact p50/p99
+    def __init__(self, window: int = 4096):
+        self.counts = np.zeros(len(BUCKETS) + 1, dtype="int64")
+        self.samples = np.zeros(window, dtype="float64")
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, sec: float):
+        self.counts[np.searchsorted(BUCKETS, sec)] += 1
+        self.samples[self.n % len(self.samples)] = sec
+        self.n += 1
+        self.total += sec
+        self.max = max(self.max, sec)
+
+    def quantiles(self, qs=(0.5, 0.99)) -> Dict[float, float]:
+        if not self.n:
+            return {q: 0.0 for q in qs}
+        s = self.samples[:min(self.n, len(self.samples))]
+        return dict(zip(qs, np.quantile(s, qs).tolist()))
+
+    def summary(self) -> Dict[str, float]:
+        q = self.quantiles()
+        return {"count": self.n, "p50": q[0.5], "p99": q[0.99], "max": self.max}
+
+
+class LatencyTracker:
+    # per-stage latency: time from the previous hop to this one, plus end-to-end from the first hop
+    def __init__(self):
+        self.stages: Dict[str, LatencyHistogram] = {}
+
+    def _hist(self, name: str) -> LatencyHistogram:
+        h = self.stages.get(name)
+        if h is None:
+            h = self.stages[name] = LatencyHistogram()
+        return h
+
+    def observe(self, trace: Optional[Trace]):
+        if trace is None or len(trace.hops) < 2:
+            return
+        (prev, t0), (stage, t1) = trace.hops[-2], trace.hops[-1]
+        self._hist(f"{prev}->{stage}").observe((t1 - t0) / 1e9)
+        first, tf = trace.hops[0]
+        if len(trace.hops) > 2:
+            self._hist(f"{first}->{stage}").observe((t1 - tf) / 1e9)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {k: h.summary() for k, h in self.stages.items()}
+
+    def prometheus(self, prefix: str = "trader") -> str:
+        name = f"{prefix}_stage_latency_seconds"
+        lines = [f"# HELP {name} Time between pipeline hops.", f"# TYPE {name} histogram"]
+        for stage, h in sorted(self.stages.items()):
+            cum = np.cumsum(h.counts)
+            for le, c in zip(BUCKETS, cum):
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{le:g}"}} {c}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {cum[-1]}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {h.total:.9f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {h.n}')
+        q = f"{prefix}_stage_latency_quantile_seconds"
+        lines += [f"# HELP {q} Recent-window latency quantiles and max.", f"# TYPE {q} gauge"]
+        for stage, h in sorted(self.stages.items()):
+            for label, v in h.quantiles().items():
+                lines.append(f'{q}{{stage="{stage}",quantile="{label:g}"}} {v:.9f}')
+            lines.append(f'{q}{{stage="{stage}",quantile="max"}} {h.max:.9f}')
+        return "\n".join(lines) + "\n"
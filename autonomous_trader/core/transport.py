@@ -0,0 +1,123 @@
+import asyncio, multiprocessing, os
+from typing import Callable, Dict, List, Optional, Set
+from .bus import EventBus, Subscription, TopicPolicy
+from .codec import decode, encode, frame, peek_topic, read_frame
+from .types import Event
+
+# Multi-process EventBus over a local Unix socket. A BusHub relays encoded event frames between
+# processes without decoding payloads; each process runs a SocketBus, which is an ordinary
+# EventBus for its own agents and forwards published events to the hub for everyone else.
+
+SUB = b"S"
+EVT = b"E"
+
+
+class BusHub:
+    def __init__(self, path: str):
+        self.path = path
+        self._clients: Dict[asyncio.StreamWriter, Set[str]] = {}
+        self._server = None
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+        return self
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        topics: Set[str] = set()
+        self._clients[writer] = topics
+        try:
+            while True:
+                kind, body = await read_frame(reader)
+                if kind == SUB:
+                    topics.add(body.decode())
+                    continue
+                topic = peek_topic(body)
+                data = frame(EVT, body)
+                targets = [w for w, t in self._clients.items() if w is not writer and topic in t]
+                for w in targets:
+                    w.write(data)
+                # a slow consumer slows its publishers rather than growing the hub's buffers
+                await asyncio.gather(*(w.drain() for w in targets), return_exceptions=True)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for w in list(self._clients):
+            w.close()
+
+
+class SocketBus(EventBus):
+    def __init__(self, path: str, policies: Optional[Dict[str, TopicPolicy]] = None):
+        super().__init__(policies)
+        self.path = path
+        self._reader = None
+        self._writer = None
+        self._pump_task = None
+        self._remote: Set[str] = set()
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+        for topic in self._remote:
+            self._writer.write(frame(SUB, topic.encode()))
+        self._pump_task = asyncio.create_task(self._pump())
+        return self
+
+    async def _pump(self):
+        try:
+            while True:
+                _, body = await read_frame(self._reader)
+                await EventBus.publish(self, decode(body))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    async def _attach(self, topic: str, sub: Subscription):
+        await super()._attach(topic, sub)
+        if topic not in self._remote:
+            self._remote.add(topic)
+            if self._writer is not None:
+                self._writer.write(frame(SUB, topic.encode()))
+                await self._writer.drain()
+
+    async def publish(self, event: Event):
+        await super().publish(event)
+        if self._writer is not None:
+            self._writer.write(frame(EVT, encode(event)))
+            await self._writer.drain()
+
+    async def close(self):
+        if self._pump_task is not None:
+            self._pump_task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+
+
+async def _serve_agents(path: str, factory: Callable[[EventBus], List]):
+    bus = await SocketBus(path).connect()
+    agents = factory(bus)
+    try:
+        await asyncio.gather(*(a.run() for a in agents))
+    finally:
+        await bus.close()
+
+
+def _agent_process_main(path: str, factory: Callable[[EventBus], List]):
+    asyncio.run(_serve_agents(path, factory))
+
+
+def spawn_agents(path: str, factory: Callable[[EventBus], List], name: str = None) -> multiprocessing.Process:
+    # run factory(bus)'s agents in their own process; factory must be a picklable top-level function
+    p = multiprocessing.Process(target=_agent_process_main, args=(path, factory), name=name, daemon=True)
+    p.start()
+    return p
@@ -1,21 +1,143 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
-import time
+from .clock import now
 
 # Base event
 @dataclass
 class Event:
     topic: str
-    ts: float = field(default_factory=lambda: time.time())
+    ts: float = field(default_factory=now)
     payload: Dict[str, Any] = field(default_factory=dict)
 
 # Common topics
-TOPIC_BAR = "bar"                    # new OHLCV bar
+TOPIC_BAR = "bar"                    # new or revised OHLCV bars (delta only)
 TOPIC_FEATURES = "features"          # computed indicators
 TOPIC_SIGNAL = "signal"              # strategy signal
 TOPIC_INTENT = "order_intent"        # proposed order
 TOPIC_ORDER = "order"                # order result (ack)
 TOPIC_FILL = "fill"                  # fill event
 TOPIC_ALERT = "alert"                # risk/monitoring alerts
-TOPIC_HEARTBEAT = "heartbeat"        # agent heartbeats
\ No newline at end of file
+TOPIC_HEARTBEAT = "heartbeat"        # agent heartbeats
+
+# OrderEvent statuses after which an order is no longer open
+ORDER_DONE = ("filled", "closed", "canceled", "cancelled", "expired", "rejected", "lost")
+
+# Typed events for the trading hot path. Slotted, with named fields instead of a payload dict;
+# `payload` rebuilds the dict view for generic consumers such as loggers. `exchange` names the
+# venue a bar came from or an order should go to (None: the default exchange).
+class TypedEvent:
+    __slots__ = ("ts", "trace")  # trace: core.tracing.Trace or None
+    topic = ""
+    fields: tuple = ()
+
+    @property
+    def payload(self) -> Dict[str, Any]:
+        return {f: getattr(self, f) for f in self.fields}
+
+    def values(self) -> tuple:
+        return tuple(getattr(self, f) for f in self.fields)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.payload})"
+
+
+class BarEvent(TypedEvent):
+    # bars: column name -> array of new/revised rows (NumPy views where possible, never copied)
+    __slots__ = ("symbol", "bars", "exchange")
+    topic = TOPIC_BAR
+    fields = ("symbol", "bars", "exchange")
+
+    def __init__(self, symbol: str, bars: Dict[str, Any], exchange: Optional[str] = None,
+                 ts: Optional[float] = None, trace=None):
+        self.ts = now() if ts is None else ts
+        self.trace = trace
+        self.exchange = exchange
+        self.symbol = symbol
+        self.bars = bars
+
+
+class FeaturesEvent(TypedEvent):
+    __slots__ = ("symbol", "features", "exchange")
+    topic = TOPIC_FEATURES
+    fields = ("symbol", "features", "exchange")
+
+    def __init__(self, symbol: str, features: Dict[str, List], exchange: Optional[str] = None,
+                 ts: Optional[float] = None, trace=None):
+        self.ts = now() if ts is None else ts
+        self.trace = trace
+        self.exchange = exchange
+        self.symbol = symbol
+        self.features = features
+
+
+class SignalEvent(TypedEvent):
+    __slots__ = ("symbol", "side", "px", "strength_bps", "exchange")
+    topic = TOPIC_SIGNAL
+    fields = ("symbol", "side", "px", "strength_bps", "exchange")
+
+    def __init__(self, symbol: str, side: str, px: float, strength_bps: float = 0.0,
+                 exchange: Optional[str] = None, ts: Optional[float] = None, trace=None):
+        self.ts = now() if ts is None else ts
+        self.trace = trace
+        self.exchange = exchange
+        self.symbol = symbol
+        self.side = side
+        self.px = px
+        self.strength_bps = strength_bps
+
+
+class IntentEvent(TypedEvent):
+    __slots__ = ("symbol", "side", "amount", "notional", "px", "client_id", "exchange")
+    topic = TOPIC_INTENT
+    fields = ("symbol", "side", "amount", "notional", "px", "client_id", "exchange")
+
+    def __init__(self, symbol: str, side: str, amount: float, notional: float, px: float,
+                 client_id: str, exchange: Optional[str] = None,
+                 ts: Optional[float] = None, trace=None):
+        self.ts = now() if ts is None else ts
+        self.trace = trace
+        self.exchange = exchange
+        self.symbol = symbol
+        self.side = side
+        self.amount = amount
+        self.notional = notional
+        self.px = px
+        self.client_id = client_id
+
+
+class OrderEvent(TypedEvent):
+    __slots__ = ("client_id", "status", "id", "paper", "exchange")
+    topic = TOPIC_ORDER
+    fields = ("client_id", "status", "id", "paper", "exchange")
+
+    def __init__(self, client_id: str, status: str, id: Optional[str] = None, paper: bool = False,
+                 exchange: Optional[str] = None, ts: Optional[float] = None, trace=None):
+        self.ts = now() if ts is None else ts
+        self.trace = trace
+        self.exchange = exchange
+        self.client_id = client_id
+        self.status = status
+        self.id = id
+        self.paper = paper
+
+
+class FillEvent(TypedEvent):
+    __slots__ = ("client_id", "symbol", "side", "amount", "price", "exchange")
+    topic = TOPIC_FILL
+    fields = ("client_id", "symbol", "side", "amount", "price", "exchange")
+
+    def __init__(self, client_id: str, symbol: str, side: str, amount: float, price: float,
+                 exchange: Optional[str] = None, ts: Optional[float] = None, trace=None):
+        self.ts = now() if ts is None else ts
+        self.trace = trace
+        self.exchange = exchange
+        self.client_id = client_id
+        self.symbol = symbol
+        self.side = side
+        self.amount = amount
+        self.price = price
+
+
+TYPED_EVENTS = {cls.topic: cls for cls in (BarEvent, FeaturesEvent, SignalEvent, IntentEvent,
+                                           OrderEvent, FillEvent)}
@@ -1,5 +1,27 @@
-import asyncio, random
+import asyncio, inspect, random, zlib
+from typing import Optional, Tuple
 
 async def sleep_jittered(sec: float, jitter: float = 0.1):
     j = sec * jitter
-    await asyncio.sleep(max(0.0, sec + random.uniform(-j, j)))
\ No newline at end of file
+    await asyncio.sleep(max(0.0, sec + random.uniform(-j, j)))
+
+async def maybe_await(x):
+    # lets agents drive both ExchangeClient and AsyncExchangeClient
+    return await x if inspect.isawaitable(x) else x
+
+_TF_UNITS = {"s": 1_000, "m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+def timeframe_ms(timeframe: str) -> int:
+    # ccxt-style timeframe string to milliseconds: "1m" -> 60000, "4h" -> 14400000
+    return int(timeframe[:-1]) * _TF_UNITS[timeframe[-1]]
+
+def shard_of(key: str, n: int) -> int:
+    # stable across processes and restarts, unlike hash()
+    return zlib.crc32(key.encode()) % n if n > 1 else 0
+
+def shard_filter(shard: Optional[Tuple[int, int]]):
+    # bus accept() predicate for shard (index, count): the events of the symbols this shard owns
+    if not shard or shard[1] <= 1:
+        return None
+    i, n = shard
+    return lambda ev: shard_of(ev.symbol, n) == i
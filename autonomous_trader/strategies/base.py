@@ -0,0 +1,48 @@
+from typing import Any, Dict, Tuple
+import numpy as np
+from ..core.indicators import batch_features
+
+try:
+    from numba import njit as _njit
+except ImportError:  # optional: kernels run as plain NumPy
+    _njit = None
+
+# A strategy declares the feature columns it reads and turns them into a signal per row
+# (+1 buy, -1 sell, 0 none) with an edge in bps. signals() is written once over arrays: live,
+# StrategyAgent passes contiguous views of the newest `lookback` rows per symbol and acts on the
+# last one; a backtest passes the whole history through batch().
+
+
+def jit(fn):
+    # numba.njit(cache=True) when numba is installed, else fn unchanged
+    return _njit(cache=True)(fn) if _njit is not None else fn
+
+
+class Strategy:
+    name = ""
+    features: Tuple[str, ...] = ("close",)
+    lookback = 2  # rows signals() needs to decide the newest one
+    defaults: Dict[str, Any] = {}
+
+    def __init__(self, **params):
+        self.params = {**self.defaults, **params}
+
+    @property
+    def windows(self) -> Dict[str, int]:
+        # indicator windows (fast=, slow=, ema=, ...) for batch features; FeatureAgent must be
+        # built with the same ones for live and backtest signals to agree
+        return {k: v for k, v in self.params.items() if k in ("fast", "slow", "ema", "std", "atr", "vwap")}
+
+    def signals(self, cols: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        # (int8 side, float64 strength_bps) per row
+        raise NotImplementedError
+
+    def on_row(self, cols: Dict[str, np.ndarray]) -> Tuple[int, float]:
+        side, strength = self.signals(cols)
+        return int(side[-1]), float(strength[-1])
+
+    def batch(self, bars: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        return self.signals(batch_features(bars, self.features, **self.windows))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.params})"
@@ -0,0 +1,33 @@
+import importlib
+from typing import Dict, Type
+
+# Strategies by name. Built-ins register when their module (strategies/<name>.py) is imported,
+# which create() does on first use; "package.module:Class" loads a plugin from anywhere.
+
+STRATEGIES: Dict[str, Type] = {}
+
+
+def register(cls):
+    STRATEGIES[cls.name] = cls
+    return cls
+
+
+def create(spec: str, **params):
+    if ":" in spec:
+        mod, cls = spec.split(":", 1)
+        return getattr(importlib.import_module(mod), cls)(**params)
+    if spec not in STRATEGIES:
+        try:
+            importlib.import_module(f"{__package__}.{spec}")
+        except ModuleNotFoundError as e:
+            if e.name != f"{__package__}.{spec}":
+                raise  # the strategy exists but one of its imports does not
+    if spec not in STRATEGIES:
+        raise KeyError(f"Unknown strategy {spec!r} (known: {', '.join(sorted(STRATEGIES)) or 'none'})")
+    return STRATEGIES[spec](**params)
+
+
+def from_config(cfg: Dict):
+    # cfg["strategy"] = {"name": "sma_cross", "params": {...}}; SMA crossover by default
+    s = cfg.get("strategy") or {}
+    return create(s.get("name", "sma_cross"), **(s.get("params") or {}))
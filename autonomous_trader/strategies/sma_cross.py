@@ -0,0 +1,30 @@
+import numpy as np
+from .base import Strategy, jit
+from .registry import register
+
+# Fast/slow SMA crossover: buy when the fast SMA crosses above the slow one, sell when it
+# crosses below; edge is the SMA gap relative to the close.
+
+
+@jit
+def crossover(fast, slow):
+    out = np.zeros(len(fast), np.int8)
+    if len(fast) < 2:
+        return out
+    # sign of the gap, 0 where either SMA is missing or zero; a cross is a sign flip
+    d = fast - slow
+    d = np.sign(np.where(np.isfinite(d) & (fast != 0) & (slow != 0), d, 0.0))
+    out[1:] = (d[1:] * (d[:-1] == -d[1:])).astype(np.int8)
+    return out
+
+
+@register
+class SmaCross(Strategy):
+    name = "sma_cross"
+    features = ("close", "sma_fast", "sma_slow")
+    lookback = 2
+    defaults = {"fast": 20, "slow": 50}
+
+    def signals(self, cols):
+        fast, slow, close = cols["sma_fast"], cols["sma_slow"], cols["close"]
+        return crossover(fast, slow), np.abs((fast - slow) / close) * 1e4
@@ -0,0 +1,68 @@
+import asyncio
+import numpy as np
+from autonomous_trader.core.bar_cache import BarCache
+
+
+class FakeExchange:
+    # serves `bars` like ccxt fetch_ohlcv: the newest `limit` without since, else from since on
+    name = "fake"
+
+    def __init__(self, bars):
+        self.bars = bars
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, timeframe, limit=200, since=None):
+        self.calls.append((limit, since))
+        rows = [r for r in self.bars if since is None or r[0] >= since]
+        return rows[:limit] if since is not None else rows[-limit:]
+
+
+def _bars(n, start=0, close=100.0):
+    return [[(start + i) * 60000, close + i, close + i + 1, close + i - 1, close + i, 1.0] for i in range(n)]
+
+
+def test_append_revises_last_bar(tmp_path):
+    cache = BarCache(str(tmp_path))
+    assert cache.write("x", "BTC/USDT", "1m", _bars(5)) == 5
+    forming = _bars(1, start=4, close=200.0)
+    assert cache.write("x", "BTC/USDT", "1m", forming + _bars(2, start=5)) == 7
+    cols = cache.columns("x", "BTC/USDT", "1m")
+    assert cols["ts"].tolist() == [i * 60000 for i in range(7)]
+    assert cols["close"][4] == 200.0
+
+
+def test_backfill_merges_in_order(tmp_path):
+    cache = BarCache(str(tmp_path))
+    cache.write("x", "BTC/USDT", "1m", _bars(5, start=10))
+    cache.write("x", "BTC/USDT", "1m", _bars(12, start=0, close=500.0))
+    cols = cache.columns("x", "BTC/USDT", "1m")
+    assert cols["ts"].tolist() == [i * 60000 for i in range(15)]
+    assert cols["close"][11] == 511.0  # the newer copy of an overlapping bar wins
+    assert cols["close"][14] == 104.0
+
+
+def test_sync_fetches_only_new_bars(tmp_path):
+    cache = BarCache(str(tmp_path), page_limit=50)
+    ex = FakeExchange(_bars(100))
+    assert cache.sync(ex, "BTC/USDT", "1m", limit=100) == 100
+    ex.bars = _bars(230)
+    ex.calls.clear()
+    assert cache.sync(ex, "BTC/USDT", "1m", limit=100) == 230
+    assert ex.calls[0] == (50, 99 * 60000)
+    assert np.array_equal(cache.columns("fake", "BTC/USDT", "1m")["ts"], np.arange(230) * 60000)
+
+
+def test_stale_short_cache_pages_forward_without_gap(tmp_path):
+    cache = BarCache(str(tmp_path), page_limit=50)
+    cache.write("fake", "BTC/USDT", "1m", _bars(20))
+    ex = FakeExchange(_bars(300))  # 280 bars arrived since, more than `limit`
+    assert cache.sync(ex, "BTC/USDT", "1m", limit=200) == 300
+    assert np.array_equal(cache.columns("fake", "BTC/USDT", "1m")["ts"], np.arange(300) * 60000)
+
+
+def test_short_cache_backfills_older_bars(tmp_path):
+    cache = BarCache(str(tmp_path))
+    cache.write("fake", "BTC/USDT", "1m", _bars(50, start=250))
+    ex = FakeExchange(_bars(300))
+    assert asyncio.run(cache.sync_async(ex, "BTC/USDT", "1m", limit=200)) == 200
+    assert np.array_equal(cache.columns("fake", "BTC/USDT", "1m")["ts"], np.arange(100, 300) * 60000)
@@ -0,0 +1,21 @@
+import numpy as np
+from autonomous_trader.core.indicators import IndicatorSet, batch_features
+
+
+def test_streaming_matches_batch():
+    rng = np.random.default_rng(3)
+    n = 600
+    c = 100 + np.cumsum(rng.normal(size=n))
+    bars = {"ts": np.arange(n) * 60000, "open": c, "high": c + rng.random(n), "low": c - rng.random(n),
+            "close": c, "volume": rng.random(n) + 0.1}
+    ind = IndicatorSet(5, 20)
+    rows = []
+    for i in range(n):
+        # a forming-bar update first, then the final values, as live streams deliver them
+        ind.update([bars[k][i] * (1.01 if k == "close" else 1) for k in ("ts", "open", "high", "low", "close", "volume")], "append")
+        ind.update([bars[k][i] for k in ("ts", "open", "high", "low", "close", "volume")], "update")
+        rows.append([np.nan if ind.now[k] is None else ind.now[k] for k in IndicatorSet.FIELDS])
+    streamed = np.array(rows)
+    batch = batch_features(bars, fast=5, slow=20)
+    for j, k in enumerate(IndicatorSet.FIELDS):
+        np.testing.assert_allclose(streamed[:, j], batch[k], rtol=1e-9, equal_nan=True, err_msg=k)
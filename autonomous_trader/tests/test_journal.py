@@ -0,0 +1,78 @@
+import asyncio
+from autonomous_trader.agents.reconcile_agent import ReconcileAgent
+from autonomous_trader.core.bus import EventBus
+from autonomous_trader.core.codec import encode
+from autonomous_trader.core.journal import Journal, _REC
+from autonomous_trader.core.replay import drain
+from autonomous_trader.core.store import Store
+from autonomous_trader.core.types import FillEvent, IntentEvent, OrderEvent
+
+
+def _store():
+    store = Store(":memory:")
+    store.set_meta("cash_USDT", "1000")
+    return store
+
+
+def test_recovery_restores_ledger_and_open_orders(tmp_path):
+    async def trade():
+        bus = EventBus()
+        recon = ReconcileAgent(bus, _store(), "paper", journal=Journal(str(tmp_path), segment_bytes=1 << 12),
+                               journal_snapshot_every=50)
+        task = asyncio.create_task(recon.run())
+        await drain(bus)
+        for i in range(300):
+            side = "buy" if i % 2 == 0 else "sell"
+            await bus.publish(IntentEvent("BTC/USDT", side, 0.01, 1.0, 100.0 + i % 7, f"c{i}"))
+            await bus.publish(OrderEvent(f"c{i}", "filled", paper=True))
+            await bus.publish(FillEvent(f"c{i}", "BTC/USDT", side, 0.01, 100.0 + i % 7))
+        await bus.publish(IntentEvent("ETH/USDT", "buy", 2.0, 20.0, 10.0, "part"))
+        await bus.publish(OrderEvent("part", "open", "X1"))
+        await bus.publish(FillEvent("part", "ETH/USDT", "buy", 0.5, 10.0))
+        await drain(bus)
+        recon.journal = None  # crash: no shutdown snapshot
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return recon.ledger.state()
+
+    before = asyncio.run(trade())
+    recovered = ReconcileAgent(EventBus(), _store(), "paper", journal=Journal(str(tmp_path)))
+    assert recovered.recovered > 0  # snapshot plus a journal tail
+    assert recovered.ledger.state() == before
+    orders = recovered.recovered_orders()
+    assert [(o["intent"].client_id, o["status"], o["id"], o["filled"]) for o in orders] == [("part", "open", "X1", 0.5)]
+
+
+def test_torn_record_ends_the_log(tmp_path):
+    j = Journal(str(tmp_path))
+    for i in range(3):
+        j.append(FillEvent(f"c{i}", "BTC/USDT", "buy", 1.0, 100.0))
+    # crash after a body is written but before its header: the header still reads as zeros
+    body = encode(FillEvent("c3", "BTC/USDT", "buy", 1.0, 100.0))
+    start = j._pos + _REC.size
+    j._mm[start:start + len(body)] = body
+    j.close()
+    j = Journal(str(tmp_path))
+    assert j.seq == 3
+    j.append(FillEvent("c4", "BTC/USDT", "buy", 1.0, 100.0))
+    assert [(seq, ev.client_id) for seq, ev in j.replay()] == [(1, "c0"), (2, "c1"), (3, "c2"), (4, "c4")]
+
+
+def test_recovery_keeps_trade_times(tmp_path):
+    async def trade():
+        bus = EventBus()
+        recon = ReconcileAgent(bus, _store(), "paper", journal=Journal(str(tmp_path)))
+        task = asyncio.create_task(recon.run())
+        await drain(bus)
+        for i in range(3):
+            await bus.publish(IntentEvent("BTC/USDT", "buy", 0.01, 1.0, 100.0, f"c{i}"))
+            await bus.publish(FillEvent(f"c{i}", "BTC/USDT", "buy", 0.01, 100.0, ts=1000.0 + i))
+        await drain(bus)
+        recon.journal = None
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(trade())
+    store = _store()
+    ReconcileAgent(EventBus(), store, "paper", journal=Journal(str(tmp_path)))
+    assert [t[0] for t in store.get_trades()] == [1000.0, 1001.0, 1002.0]
@@ -0,0 +1,38 @@
+import asyncio
+from autonomous_trader.agents.reconcile_agent import ReconcileAgent
+from autonomous_trader.core.bus import EventBus
+from autonomous_trader.core.store import Store
+from autonomous_trader.core.types import FillEvent
+
+
+def test_partial_fills_are_separate_trades():
+    async def run():
+        bus = EventBus()
+        store = Store(":memory:")
+        recon = ReconcileAgent(bus, store, "paper")
+        task = asyncio.create_task(recon.run())
+        await asyncio.sleep(0.01)
+        await bus.publish(FillEvent("c1", "BTC/USDT", "buy", 0.4, 100.0))
+        await bus.publish(FillEvent("c1", "BTC/USDT", "buy", 0.6, 101.0))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return recon, store
+
+    recon, store = asyncio.run(run())
+    assert recon.ledger.qty("BTC/USDT") == 1.0
+    trades = store.get_trades("paper")
+    assert [t[3] for t in trades] == [0.4, 0.6]
+    assert sum(t[3] for t in trades) == recon.ledger.qty("BTC/USDT")
+
+
+def test_equity_rows_are_written_with_the_ledger_snapshot():
+    store = Store(":memory:")
+    store.set_meta("cash_USDT", "1000")
+    recon = ReconcileAgent(EventBus(), store, "backtest", snapshot_interval=3600)
+    for i in range(100):
+        recon.mark("BTC/USDT", i * 60000, 100.0 + i)
+    assert store.get_equity() == []  # buffered: no commit per bar
+    assert recon.metrics.updates == 99
+    recon.persist()
+    assert len(store.get_equity()) == 99
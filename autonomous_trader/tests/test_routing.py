@@ -0,0 +1,59 @@
+import asyncio
+from autonomous_trader.agents.execution_agent import ExecutionAgent
+from autonomous_trader.agents.risk_agent import RiskAgent
+from autonomous_trader.core.bus import EventBus
+from autonomous_trader.core.replay import drain
+from autonomous_trader.core.types import IntentEvent, SignalEvent, TOPIC_ALERT, TOPIC_INTENT
+
+
+class FakeVenue:
+    name = "binance"
+
+    def __init__(self):
+        self.orders = []
+
+    def create_market_order(self, symbol, side, amount, client_id=None):
+        self.orders.append(client_id)
+        return {"id": client_id, "status": "closed", "filled": amount, "cost": amount * 100.0}
+
+    def fetch_orders(self, symbol, since=None):
+        return []
+
+    def fetch_balance(self):
+        return {"total": {"USDT": 1000.0}}
+
+    def market_meta(self, symbol):
+        return {}
+
+
+def _run(agent, events):
+    async def run():
+        bus = agent.bus
+        out = []
+        bus.add_tap(out.append)
+        task = asyncio.create_task(agent.run())
+        await drain(bus)
+        for ev in events:
+            await bus.publish(ev)
+        await drain(bus, 10)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return out
+
+    return asyncio.run(run())
+
+
+def test_intent_for_unknown_venue_is_dropped():
+    venue = FakeVenue()
+    agent = ExecutionAgent(EventBus(), {"binance": venue}, mode="live")
+    out = _run(agent, [IntentEvent("BTC/USDT", "buy", 1.0, 100.0, 100.0, "k1", "kraken"),
+                       IntentEvent("BTC/USDT", "buy", 1.0, 100.0, 100.0, "b1", "binance")])
+    assert venue.orders == ["b1"]
+    assert any(ev.topic == TOPIC_ALERT and "kraken" in ev.payload["msg"] for ev in out)
+
+
+def test_signal_for_unknown_venue_is_not_sized():
+    agent = RiskAgent(EventBus(), {"binance": FakeVenue()}, {"risk": {"risk_per_trade_pct": 0.1}})
+    out = _run(agent, [SignalEvent("BTC/USDT", "buy", 100.0, 10.0, exchange="kraken")])
+    assert not [ev for ev in out if ev.topic == TOPIC_INTENT]
+    assert any(ev.topic == TOPIC_ALERT and "kraken" in ev.payload["msg"] for ev in out)
@@ -0,0 +1,21 @@
+import sqlite3
+from autonomous_trader.core.store import Store
+
+
+def test_lazy_sync_only_with_write_behind(tmp_path):
+    plain = Store(str(tmp_path / "plain.db"))
+    behind = Store(str(tmp_path / "behind.db"), write_behind=True)
+    assert plain._conn.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+    assert behind._conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    plain.close()
+    behind.close()
+
+
+def test_flush_commits_queued_writes(tmp_path):
+    path = str(tmp_path / "trader.db")
+    store = Store(path, write_behind=True)
+    for i in range(10):
+        store.add_trade(f"c{i}", 1000.0 + i, "BTC/USDT", "buy", 1.0, 100.0, 0.0, "paper")
+    assert store.flush()
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 10
+    store.close()